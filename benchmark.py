@@ -0,0 +1,170 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from game.connect4 import Connect4, BitboardConnect4, simulate as simulate_connect4
+from game.ttt import TicTacToe, BitboardTicTacToe, simulate as simulate_tic_tac_toe
+from players.default import Connect4DefaultPlayer, TTTDefaultPlayer
+from players.minimax import Connect4MinimaxPlayer, Connect4MinimaxABPPlayer, TTTMinimaxPlayer, TTTMinimaxABPPlayer
+from players.qleaarning import Connect4QLearningPlayer, TTTQLearningPlayer, train_q_learning_players
+
+
+# Connect4 test positions as the columns played from the empty board
+CONNECT4_POSITIONS = [
+    [3, 3],
+    [3, 2, 4, 4, 2, 3],
+    [0, 6, 1, 5, 2, 4, 3, 3],
+    [3, 3, 3, 3, 2, 4, 2, 4, 1],
+]
+
+
+def perft_connect4(game, depth):
+    """Counts the move sequences of exactly depth moves; won positions are counted but not expanded further."""
+    if depth == 0:
+        return 1
+    nodes = 0
+    for col in game.get_possible_columns():
+        game.push(col)
+        if depth == 1:
+            nodes += 1  # Still made and unmade, as the benchmark times push() and pop()
+        elif game.winner is None:
+            nodes += perft_connect4(game, depth - 1)
+        game.pop()
+    return nodes
+
+
+def perft_ttt(game, depth):
+    """Counts the move sequences of exactly depth moves; won positions are counted but not expanded further."""
+    if depth == 0:
+        return 1
+    nodes = 0
+    for row, col in game.available_moves():
+        game.push(row, col)
+        if depth == 1:
+            nodes += 1  # Still made and unmade, as the benchmark times push() and pop()
+        elif game.winner is None:
+            nodes += perft_ttt(game, depth - 1)
+        game.pop()
+    return nodes
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    value = function(*args)
+    return value, time.perf_counter() - start
+
+
+def _connect4_position(game_class, moves):
+    game = game_class()
+    for col in moves:
+        game.user_input(col)
+    game.beginning = False
+    return game
+
+
+def run_benchmarks(quick=False):
+    """Runs every benchmark and returns {name: {"value", "unit", "higher_is_better"}}."""
+    results = {}
+
+    def record(name, value, unit, higher_is_better):
+        results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        print(f"{name}: {value:.6g} {unit}", file=sys.stderr)
+
+    connect4_depth, ttt_depth = (5, 9) if quick else (6, 9)
+    for game_class in (Connect4, BitboardConnect4):
+        nodes, seconds = _timed(perft_connect4, game_class(), connect4_depth)
+        record(f"perft.{game_class.__name__}.depth{connect4_depth}.nodes", nodes, "nodes", None)
+        record(f"perft.{game_class.__name__}.depth{connect4_depth}.nps", nodes / seconds, "nodes/s", True)
+    for game_class in (TicTacToe, BitboardTicTacToe):
+        nodes, seconds = _timed(perft_ttt, game_class(), ttt_depth)
+        record(f"perft.{game_class.__name__}.depth{ttt_depth}.nodes", nodes, "nodes", None)
+        record(f"perft.{game_class.__name__}.depth{ttt_depth}.nps", nodes / seconds, "nodes/s", True)
+
+    search_depth = 4 if quick else 5
+    for player_class in (Connect4MinimaxPlayer, Connect4MinimaxABPPlayer):
+        nodes = seconds = 0
+        for moves in CONNECT4_POSITIONS:
+            game = _connect4_position(Connect4, moves)
+            player = player_class(game.current_player, max_depth=search_depth)
+            _, elapsed = _timed(player.input, game)
+            nodes += player.last_search["nodes"]
+            seconds += elapsed
+        record(f"search.{player_class.__name__}.depth{search_depth}.nodes", nodes, "nodes", None)
+        record(f"search.{player_class.__name__}.depth{search_depth}.nps", nodes / seconds, "nodes/s", True)
+
+    for player_class in (TTTMinimaxPlayer, TTTMinimaxABPPlayer):
+        game = TicTacToe()
+        game.beginning = False
+        player = player_class("X")
+        arguments = (game, True) if player_class is TTTMinimaxPlayer else (game, True, -float('inf'), float('inf'))
+        _, seconds = _timed(player.minimax, *arguments)
+        record(f"search.{player_class.__name__}.full_tree.seconds", seconds, "s", False)
+
+    episodes = 2_000 if quick else 10_000
+    for game_class, ql_player_class in ((TicTacToe, TTTQLearningPlayer), (Connect4, Connect4QLearningPlayer)):
+        random.seed(0)
+        _, seconds = _timed(train_q_learning_players, episodes, ql_player_class("X"), ql_player_class("O"), game_class, False)
+        record(f"training.{ql_player_class.__name__}.episodes_per_second", episodes / seconds, "episodes/s", True)
+
+    games = 200 if quick else 1_000
+    for name, simulate, player_class in (("ttt", simulate_tic_tac_toe, TTTDefaultPlayer),
+                                         ("connect4", simulate_connect4, Connect4DefaultPlayer)):
+        random.seed(0)
+        start = time.perf_counter()
+        simulate(player_class("X"), player_class("O"), games)
+        record(f"tournament.{name}.default_vs_default.games_per_second", games / (time.perf_counter() - start), "games/s", True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the regressions of results against a baseline run, as readable strings.
+
+    Counts (higher_is_better None) must match exactly; rates and times may not get worse by more than
+    tolerance, as a fraction of the baseline.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["value"], result["value"]
+        if result["higher_is_better"] is None:
+            if new != old:
+                regressions.append(f"{name}: {new} != baseline {old}")
+        elif result["higher_is_better"] and new < old * (1 - tolerance):
+            regressions.append(f"{name}: {new:.6g} is {1 - new / old:.1%} below baseline {old:.6g}")
+        elif not result["higher_is_better"] and new > old * (1 + tolerance):
+            regressions.append(f"{name}: {new:.6g} is {new / old - 1:.1%} above baseline {old:.6g}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark move generation, search, training and game play.")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads for a fast check")
+    parser.add_argument("--output", help="write the results as JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="compare against the results stored in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed slowdown as a fraction (default 0.1)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.quick)
+    report = {"python": platform.python_version(), "machine": platform.machine(), "quick": args.quick,
+              "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "benchmarks": results}
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file)["benchmarks"], args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
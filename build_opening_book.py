@@ -0,0 +1,21 @@
+import argparse
+import time
+
+from players.opening_book import OpeningBook
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds the Connect4 opening book for the minimax players.")
+    parser.add_argument("--plies", type=int, default=4, help="Book every position up to this many moves")
+    parser.add_argument("--depth", type=int, default=8, help="Search depth of each book position")
+    parser.add_argument("--output", default="connect4_opening_book.npy")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    book = OpeningBook.build(args.plies, args.depth)
+    book.save(args.output)
+    print(f"Wrote {len(book)} positions to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import numpy as np
+
+from game.ttt import WIN_MASKS, POWERS_OF_3
+
+# Cell values in the batch boards
+EMPTY, X, O = 0, 1, -1
+
+
+class _BatchGame:
+    """Shared bookkeeping for N games stepped together. Finished games are reset automatically.
+
+    current[i] is X or O for the player to move in game i, lengths[i] the number of moves made so far.
+    """
+    rows = cols = num_actions = 0
+
+    def __init__(self, num_games):
+        self.num_games = num_games
+        self.boards = np.zeros((num_games, self.rows, self.cols), dtype=np.int8)
+        self.current = np.full(num_games, X, dtype=np.int8)
+        self.lengths = np.zeros(num_games, dtype=np.int16)
+
+    def reset(self, games=None):
+        """Clears the given games (a boolean mask or index array), or all of them."""
+        games = slice(None) if games is None else games
+        self.boards[games] = EMPTY
+        self.current[games] = X
+        self.lengths[games] = 0
+
+    def step(self, actions):
+        """Plays one move in every game for the player to move.
+
+        Returns (done, winners, lengths) for the move just made: done marks finished games, winners
+        holds X, O or EMPTY (draw or still running) and lengths the game lengths. Finished games are
+        reset before returning, so the next step starts them over.
+        """
+        actions = np.asarray(actions)
+        if not self.legal_moves()[np.arange(self.num_games), actions].all():
+            raise ValueError("Illegal move in batch step.")
+        self._place(actions)
+        self.lengths += 1
+        won = self._wins(self.current)
+        done = won | (self.lengths == self.rows * self.cols)
+        winners = np.where(won, self.current, EMPTY).astype(np.int8)
+        lengths = self.lengths.copy()
+        self.current = -self.current
+        if done.any():
+            self.reset(done)
+        return done, winners, lengths
+
+
+class BatchConnect4(_BatchGame):
+    """N Connect4 games in an (N, 6, 7) int8 array, row 0 at the top as in `Connect4.board`."""
+    rows, cols, num_actions = 6, 7, 7
+
+    def __init__(self, num_games):
+        super().__init__(num_games)
+        self.heights = np.zeros((num_games, self.cols), dtype=np.int8)
+        # Bit of each cell in BitboardConnect4's layout, for position_keys()
+        self.bits = np.array([[1 << (col * 7 + self.rows - 1 - row) for col in range(self.cols)]
+                              for row in range(self.rows)], dtype=np.uint64)
+
+    def reset(self, games=None):
+        super().reset(games)
+        self.heights[slice(None) if games is None else games] = 0
+
+    def legal_moves(self):
+        """Returns an (N, 7) boolean array of the columns that are not full."""
+        return self.heights < self.rows
+
+    def _place(self, actions):
+        games = np.arange(self.num_games)
+        self.boards[games, self.rows - 1 - self.heights[games, actions], actions] = self.current
+        self.heights[games, actions] += 1
+
+    def _wins(self, players):
+        marks = self.boards == players[:, None, None]
+        horizontal = marks[:, :, :-3] & marks[:, :, 1:-2] & marks[:, :, 2:-1] & marks[:, :, 3:]
+        vertical = marks[:, :-3] & marks[:, 1:-2] & marks[:, 2:-1] & marks[:, 3:]
+        diagonal = marks[:, :-3, :-3] & marks[:, 1:-2, 1:-2] & marks[:, 2:-1, 2:-1] & marks[:, 3:, 3:]
+        anti_diagonal = marks[:, :-3, 3:] & marks[:, 1:-2, 2:-1] & marks[:, 2:-1, 1:-2] & marks[:, 3:, :-3]
+        return (horizontal.any(axis=(1, 2)) | vertical.any(axis=(1, 2)) |
+                diagonal.any(axis=(1, 2)) | anti_diagonal.any(axis=(1, 2)))
+
+    def position_keys(self):
+        """Returns a unique 64-bit key per game: X's cells plus all occupied cells, in bitboard layout."""
+        x_cells = np.where(self.boards == X, self.bits, 0).sum(axis=(1, 2), dtype=np.uint64)
+        occupied = np.where(self.boards != EMPTY, self.bits, 0).sum(axis=(1, 2), dtype=np.uint64)
+        return x_cells + occupied
+
+
+# Cell indices of the 8 winning lines, for the batch TicTacToe check
+WIN_LINES = np.array([[cell for cell in range(9) if line >> cell & 1] for line in WIN_MASKS])
+
+
+class BatchTicTacToe(_BatchGame):
+    """N Tic Tac Toe games in an (N, 3, 3) int8 array. Actions are cell indices 3 * row + col."""
+    rows, cols, num_actions = 3, 3, 9
+
+    def __init__(self, num_games):
+        super().__init__(num_games)
+        self.powers = np.array(POWERS_OF_3, dtype=np.int32)
+
+    def legal_moves(self):
+        """Returns an (N, 9) boolean array of the empty cells."""
+        return self.boards.reshape(self.num_games, 9) == EMPTY
+
+    def _place(self, actions):
+        self.boards.reshape(self.num_games, 9)[np.arange(self.num_games), actions] = self.current
+
+    def _wins(self, players):
+        lines = self.boards.reshape(self.num_games, 9)[:, WIN_LINES]
+        return (lines == players[:, None, None]).all(axis=2).any(axis=1)
+
+    def state_codes(self):
+        """Returns the base-3 code of each board, matching `game.ttt.state_code`."""
+        digits = self.boards.reshape(self.num_games, 9).astype(np.int32) % 3  # X -> 1, O -> 2
+        return digits @ self.powers
@@ -1,9 +1,19 @@
+import random
+
+from game.zobrist import CONNECT4_KEYS
+
+
 class Connect4:
     def __init__(self):
         """Initialize the Connect4 board."""
         self.rows = 6
         self.cols = 7
         self.board = [[" " for _ in range(self.cols)] for _ in range(self.rows)]
+        self.heights = [0] * self.cols  # Filled cells per column, kept in step by place() and remove()
+        self.move_count = 0
+        self.hash = 0  # Zobrist hash of the board, see game.zobrist
+        self.moves = []  # Columns played through push(), used by pop()
+        self.winner = None  # Symbol of the player whose last move connected four
         self.current_player = "X"
         self.beginning = True
 
@@ -11,6 +21,18 @@ class Connect4:
     def to_string(cls) -> str:
         return "connect4"
 
+    def reset(self):
+        """Clears the board in place for a new game."""
+        for row in self.board:
+            row[:] = [" "] * self.cols
+        self.heights[:] = [0] * self.cols
+        self.move_count = 0
+        self.hash = 0
+        self.moves.clear()
+        self.winner = None
+        self.current_player = "X"
+        self.beginning = True
+
     def print_board(self):
         """Prints the Connect4 board."""
         for row in self.board:
@@ -21,30 +43,87 @@ class Connect4:
     def user_input(self, col):
         """Allows the player to place their mark on the board based on the given column."""
         if self.is_valid_move(col):
-            for row in range(self.rows - 1, -1, -1):
-                if self.board[row][col] == " ":
-                    self.board[row][col] = self.current_player
-                    if self.check_win(self.current_player):  # Pass current player's symbol
-                        return True, self.current_player
-                    elif self.check_draw():
-                        return True, None
-                    self.switch_player()
-                    return False, None
+            row = self.place(col, self.current_player)
+            if self.connects_four(row, col, self.current_player):  # Only lines through the new mark can be new
+                self.winner = self.current_player
+                return True, self.current_player
+            elif self.check_draw():
+                return True, None
+            self.switch_player()
+            return False, None
         else:
             print("Invalid move. Please try again.")
             return False, None
     
     def is_valid_move(self, col):
         """Checks if the given column is a valid move."""
-        return 0 <= col < self.cols and self.board[0][col] == " "
+        return 0 <= col < self.cols and self.heights[col] < self.rows
 
     def get_next_open_row(self, col):
         """Find the next available row in a given column."""
-        for row in range(self.rows - 1, -1, -1):
-            if self.board[row][col] == " ":
-                return row
+        if self.heights[col] < self.rows:
+            return self.rows - 1 - self.heights[col]
         return -1  # Column is full
 
+    def place(self, col, symbol):
+        """Drops symbol into a column that is not full and returns the row it lands in.
+
+        Players that try moves on the board go through place() and remove() so that the heights
+        and move count stay in step with the board.
+        """
+        row = self.rows - 1 - self.heights[col]
+        self.board[row][col] = symbol
+        self.heights[col] += 1
+        self.move_count += 1
+        self.hash ^= CONNECT4_KEYS[row * self.cols + col][symbol]
+        return row
+
+    def remove(self, col):
+        """Takes the top symbol out of a column, undoing place()."""
+        self.heights[col] -= 1
+        self.move_count -= 1
+        row = self.rows - 1 - self.heights[col]
+        self.hash ^= CONNECT4_KEYS[row * self.cols + col][self.board[row][col]]
+        self.board[row][col] = " "
+
+    def push(self, col):
+        """Makes a move for the current player and hands the turn over, so it can be undone with pop().
+
+        winner is set when the move connects four. Searches stop at such positions, so pop() simply
+        clears it again.
+        """
+        row = self.place(col, self.current_player)
+        if self.connects_four(row, col, self.current_player):
+            self.winner = self.current_player
+        self.moves.append(col)
+        self.switch_player()
+
+    def pop(self):
+        """Undoes the last move made with push()."""
+        col = self.moves.pop()
+        self.switch_player()
+        self.remove(col)
+        self.winner = None
+        return col
+
+    def is_winning_move(self, col, symbol):
+        """Checks if dropping symbol into a column that is not full would connect four, without playing it."""
+        return self.connects_four(self.rows - 1 - self.heights[col], col, symbol)
+
+    def connects_four(self, row, col, symbol):
+        """Checks for four of symbol in a line through (row, col), counting that cell as symbol."""
+        board = self.board
+        for row_dir, col_dir in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            count = 1
+            for step in (1, -1):
+                r, c = row + step * row_dir, col + step * col_dir
+                while 0 <= r < self.rows and 0 <= c < self.cols and board[r][c] == symbol:
+                    count += 1
+                    r, c = r + step * row_dir, c + step * col_dir
+            if count >= 4:
+                return True
+        return False
+
     def check_win(self, player_symbol):
         """Checks if the specified player has won the game."""
         for row in range(self.rows):
@@ -66,23 +145,254 @@ class Connect4:
 
     def check_draw(self):
         """Checks if the game is a draw."""
-        return all([self.board[row][col] != " " for row in range(self.rows) for col in range(self.cols)])
+        return self.move_count == self.rows * self.cols
 
     def switch_player(self):
         """Switches the turn to the other player."""
         self.current_player = "O" if self.current_player == "X" else "X"
     
+    def position_key(self):
+        """Returns a unique 64-bit key for the position, the same as BitboardConnect4.position_key()."""
+        return position_key(self.board)
+
     def get_possible_columns(self):
         """Returns a list of columns where a player can place their marker."""
-        possible_columns = []
-        for col in range(self.cols):
-            if self.board[0][col] == " ":  # Check if the top row of the column is empty
-                possible_columns.append(col)
-        return possible_columns
+        return [col for col in range(self.cols) if self.heights[col] < self.rows]
+
+
+class _BitboardRow:
+    """A single row of a BitboardConnect4 board, readable and writable like a list of symbols."""
+    def __init__(self, game, row):
+        self.game = game
+        self.height = game.rows - 1 - row  # Bitboard rows count upwards from the bottom
+
+    def __getitem__(self, col):
+        bit = 1 << (col * BitboardConnect4.COLUMN_BITS + self.height)
+        if self.game.masks["X"] & bit:
+            return "X"
+        if self.game.masks["O"] & bit:
+            return "O"
+        return " "
+
+    def __setitem__(self, col, symbol):
+        game = self.game
+        bit = 1 << (col * BitboardConnect4.COLUMN_BITS + self.height)
+        game.move_count += (symbol != " ") - bool((game.masks["X"] | game.masks["O"]) & bit)
+        cell = (game.rows - 1 - self.height) * game.cols + col
+        old = self[col]
+        if old != " ":
+            game.hash ^= CONNECT4_KEYS[cell][old]
+        game.masks["X"] &= ~bit
+        game.masks["O"] &= ~bit
+        if symbol != " ":
+            game.masks[symbol] |= bit
+            game.hash ^= CONNECT4_KEYS[cell][symbol]
+        # Players only ever fill or clear the top of a column, so the height is the highest filled cell + 1
+        column = ((game.masks["X"] | game.masks["O"]) >> (col * BitboardConnect4.COLUMN_BITS)) & BitboardConnect4.COLUMN_MASK
+        game.heights[col] = column.bit_length()
+
+    def __iter__(self):
+        return (self[col] for col in range(self.game.cols))
+
+    def __len__(self):
+        return self.game.cols
 
 
-def play_connect4(player_x, player_o, display_board=True):
-    game = Connect4()
+class BitboardConnect4:
+    """Connect4 backed by one 64-bit mask per player and per-column heights.
+
+    Each column takes COLUMN_BITS bits of a mask, bottom cell first, with one spare bit on top so that
+    shifted lines never wrap from one column into the next. `board` is a row-major view over the masks
+    so players written against `Connect4` keep working unchanged.
+    """
+    COLUMN_BITS = 7
+    COLUMN_MASK = (1 << 6) - 1
+
+    def __init__(self):
+        """Initialize the Connect4 bitboards."""
+        self.rows = 6
+        self.cols = 7
+        self.masks = {"X": 0, "O": 0}
+        self.heights = [0] * self.cols
+        self.move_count = 0
+        self.hash = 0  # Zobrist hash of the board, the same as Connect4.hash
+        self.moves = []  # Columns played through push(), used by pop()
+        self.winner = None  # Symbol of the player whose last move connected four
+        self.board = [_BitboardRow(self, row) for row in range(self.rows)]
+        self.current_player = "X"
+        self.beginning = True
+
+    @classmethod
+    def to_string(cls) -> str:
+        return "connect4"
+
+    def reset(self):
+        """Clears the bitboards for a new game."""
+        self.masks["X"] = self.masks["O"] = 0
+        self.heights[:] = [0] * self.cols
+        self.move_count = 0
+        self.hash = 0
+        self.moves.clear()
+        self.winner = None
+        self.current_player = "X"
+        self.beginning = True
+
+    def print_board(self):
+        """Prints the Connect4 board."""
+        for row in self.board:
+            print("|".join(row))
+            print("-" * (4 * self.cols - 1))
+        print()
+
+    def user_input(self, col):
+        """Allows the player to place their mark on the board based on the given column."""
+        if self.is_valid_move(col):
+            self.drop(col)
+            if self.check_win(self.current_player):
+                self.winner = self.current_player
+                return True, self.current_player
+            elif self.check_draw():
+                return True, None
+            self.switch_player()
+            return False, None
+        else:
+            print("Invalid move. Please try again.")
+            return False, None
+
+    def is_valid_move(self, col):
+        """Checks if the given column is a valid move."""
+        return 0 <= col < self.cols and self.heights[col] < self.rows
+
+    def get_next_open_row(self, col):
+        """Find the next available row in a given column."""
+        if self.heights[col] < self.rows:
+            return self.rows - 1 - self.heights[col]
+        return -1  # Column is full
+
+    def drop(self, col):
+        """Drops the current player's mark into the given column without switching turns."""
+        self.place(col, self.current_player)
+
+    def place(self, col, symbol):
+        """Drops symbol into a column that is not full and returns the row it lands in, like Connect4.place()."""
+        self.masks[symbol] |= 1 << (col * self.COLUMN_BITS + self.heights[col])
+        self.heights[col] += 1
+        self.move_count += 1
+        row = self.rows - self.heights[col]
+        self.hash ^= CONNECT4_KEYS[row * self.cols + col][symbol]
+        return row
+
+    def remove(self, col):
+        """Takes the top symbol out of a column, undoing place()."""
+        self.heights[col] -= 1
+        self.move_count -= 1
+        bit = 1 << (col * self.COLUMN_BITS + self.heights[col])
+        symbol = "X" if self.masks["X"] & bit else "O"
+        self.masks[symbol] &= ~bit
+        self.hash ^= CONNECT4_KEYS[(self.rows - 1 - self.heights[col]) * self.cols + col][symbol]
+
+    def push(self, col):
+        """Makes a move for the current player and hands the turn over, so it can be undone with pop()."""
+        # Inlined place(), as search calls push() and pop() at every node
+        symbol = self.current_player
+        height = self.heights[col]
+        mask = self.masks[symbol] | 1 << (col * self.COLUMN_BITS + height)
+        self.masks[symbol] = mask
+        self.heights[col] = height + 1
+        self.move_count += 1
+        self.hash ^= CONNECT4_KEYS[(self.rows - 1 - height) * self.cols + col][symbol]
+        if has_four_in_a_row(mask):
+            self.winner = symbol
+        self.moves.append(col)
+        self.current_player = "O" if symbol == "X" else "X"
+
+    def pop(self):
+        """Undoes the last move made with push()."""
+        col = self.moves.pop()
+        symbol = self.current_player = "O" if self.current_player == "X" else "X"
+        height = self.heights[col] - 1
+        self.heights[col] = height
+        self.move_count -= 1
+        self.masks[symbol] &= ~(1 << (col * self.COLUMN_BITS + height))
+        self.hash ^= CONNECT4_KEYS[(self.rows - 1 - height) * self.cols + col][symbol]
+        self.winner = None
+        return col
+
+    def is_winning_move(self, col, symbol):
+        """Checks if dropping symbol into a column that is not full would connect four, without playing it."""
+        return has_four_in_a_row(self.masks[symbol] | 1 << (col * self.COLUMN_BITS + self.heights[col]))
+
+    def check_win(self, player_symbol):
+        """Checks if the specified player has won the game."""
+        return has_four_in_a_row(self.masks[player_symbol])
+
+    def check_draw(self):
+        """Checks if the game is a draw."""
+        return self.move_count == self.rows * self.cols
+
+    def switch_player(self):
+        """Switches the turn to the other player."""
+        self.current_player = "O" if self.current_player == "X" else "X"
+
+    def get_possible_columns(self):
+        """Returns a list of columns where a player can place their marker."""
+        return [col for col in range(self.cols) if self.heights[col] < self.rows]
+
+    def position_key(self):
+        """Returns a unique 64-bit key for the position: X's cells plus all occupied cells.
+
+        Within a column the occupied cells form a run of ones from the bottom, so adding them carries
+        into the lowest empty cell and encodes the height; the sum therefore never repeats.
+        """
+        return self.masks["X"] + (self.masks["X"] | self.masks["O"])
+
+
+def position_key(board):
+    """Returns the BitboardConnect4 position key of a 6x7 board of symbols."""
+    rows = len(board)
+    x_mask = mask = 0
+    for row in range(rows):
+        for col in range(len(board[row])):
+            if board[row][col] != " ":
+                bit = 1 << (col * BitboardConnect4.COLUMN_BITS + rows - 1 - row)
+                mask |= bit
+                if board[row][col] == "X":
+                    x_mask |= bit
+    return x_mask + mask
+
+
+def mirror_position_key(key):
+    """Returns the position key of the left-right mirror image of a position."""
+    column_mask = (1 << BitboardConnect4.COLUMN_BITS) - 1
+    mirrored = 0
+    for col in range(7):
+        mirrored |= (key >> (col * BitboardConnect4.COLUMN_BITS) & column_mask) << ((6 - col) * BitboardConnect4.COLUMN_BITS)
+    return mirrored
+
+
+def place_position_key(game, key):
+    """Places the pieces of the position with this position key on an empty game, column by column."""
+    column_mask = (1 << BitboardConnect4.COLUMN_BITS) - 1
+    for col in range(game.cols):
+        bits = key >> (col * BitboardConnect4.COLUMN_BITS) & column_mask
+        height = (bits + 1).bit_length() - 1  # bits is X's cells plus 2 ** height - 1, see position_key()
+        x_cells = bits - ((1 << height) - 1)
+        for row in range(height):
+            game.place(col, "X" if x_cells >> row & 1 else "O")
+
+
+def has_four_in_a_row(mask):
+    """Checks a BitboardConnect4 mask for four connected cells in any direction."""
+    # Vertical, horizontal and both diagonals are 1, 7, 8 and 6 bits apart
+    for shift in (1, BitboardConnect4.COLUMN_BITS, BitboardConnect4.COLUMN_BITS + 1, BitboardConnect4.COLUMN_BITS - 1):
+        pairs = mask & (mask >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+def play_connect4(player_x, player_o, display_board=True, game_class=Connect4):
+    game = game_class()
     while True:
         if display_board:
             print(f"{game.current_player}'s Turn")
@@ -99,3 +409,29 @@ def play_connect4(player_x, player_o, display_board=True):
                 return winner
         except ValueError:
             print("Invalid input. Please enter a number between 0 and 6.")
+
+
+def simulate(player_x, player_o, n_games, game_class=Connect4, seeds=None):
+    """Plays n_games games without any output on one reused board.
+
+    Returns a (winner, length, moves) tuple per game, winner being None for a draw. An invalid move
+    raises ValueError instead of being retried, as no player here asks for a second try.
+    With seeds, random is seeded with seeds[i] before game i, so that any game can be replayed alone.
+    """
+    game = game_class()
+    players = {"X": player_x, "O": player_o}
+    results = []
+    for index in range(n_games):
+        if seeds is not None:
+            random.seed(seeds[index])
+        game.reset()
+        moves = []
+        game_over = False
+        while not game_over:
+            col = players[game.current_player].input(game)
+            if not game.is_valid_move(col):
+                raise ValueError(f"Invalid move {col!r} by {game.current_player}")
+            moves.append(col)
+            game_over, winner = game.user_input(col)
+        results.append((winner, len(moves), moves))
+    return results
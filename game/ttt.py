@@ -1,13 +1,37 @@
+import random
+
+from game.zobrist import TTT_KEYS
+
+
 class TicTacToe:
     def __init__(self):
         """Initialize the Tic Tac Toe board."""
         self.board = [[" " for _ in range(3)] for _ in range(3)]
+        self.code = 0  # Base-3 state code of the board, see state_code()
+        self.empty_mask = FULL_MASK  # Empty cells as a 9-bit mask, kept in step by place() and remove()
+        self.move_count = 0
+        self.hash = 0  # Zobrist hash of the board, see game.zobrist
+        self.moves = []  # Cells played through push(), used by pop()
+        self.winner = None  # Symbol of the player whose last move completed a line
         self.current_player = "X"
         self.beginning = True
 
     @classmethod
     def to_string(cls) -> str:
         return "ttt"
+
+    def reset(self):
+        """Clears the board in place for a new game."""
+        for row in self.board:
+            row[:] = [" "] * 3
+        self.code = 0
+        self.empty_mask = FULL_MASK
+        self.move_count = 0
+        self.hash = 0
+        self.moves.clear()
+        self.winner = None
+        self.current_player = "X"
+        self.beginning = True
     
     def print_board(self):
         """Prints the Tic Tac Toe board."""
@@ -18,9 +42,10 @@ class TicTacToe:
 
     def user_input(self, row, col):
         """Allows the player to place their mark on the board based on the given row and column."""
-        if 0 <= row < 3 and 0 <= col < 3 and self.board[row][col] == " ":
-            self.board[row][col] = self.current_player
-            if self.check_win(self.current_player):  # Pass current player's symbol
+        if self.is_valid_move(row, col):
+            self.place(row, col, self.current_player)
+            if self.completes_line(row, col, self.current_player):  # Only lines through the new mark can be new
+                self.winner = self.current_player
                 return True, self.current_player
             elif self.check_draw():
                 return True, None
@@ -29,6 +54,67 @@ class TicTacToe:
             print("Invalid move. Please try again.")
         return False, None
 
+    def is_valid_move(self, row, col):
+        """Checks if the given cell is on the board and empty."""
+        return 0 <= row < 3 and 0 <= col < 3 and bool(self.empty_mask >> (3 * row + col) & 1)
+
+    def available_moves(self):
+        """Returns the empty cells as (row, col) tuples in row-major order."""
+        return OPEN_CELLS[self.empty_mask]
+
+    def place(self, row, col, symbol):
+        """Puts symbol on an empty cell.
+
+        Players that try moves on the board go through place() and remove() so that the state code,
+        empty cells and move count stay in step with the board.
+        """
+        self.board[row][col] = symbol
+        self.code += CELL_DIGITS[symbol] * POWERS_OF_3[3 * row + col]
+        self.empty_mask &= ~(1 << (3 * row + col))
+        self.move_count += 1
+        self.hash ^= TTT_KEYS[3 * row + col][symbol]
+
+    def remove(self, row, col):
+        """Clears a cell, undoing place()."""
+        symbol = self.board[row][col]
+        self.code -= CELL_DIGITS[symbol] * POWERS_OF_3[3 * row + col]
+        self.hash ^= TTT_KEYS[3 * row + col][symbol]
+        self.board[row][col] = " "
+        self.empty_mask |= 1 << (3 * row + col)
+        self.move_count -= 1
+
+    def push(self, row, col):
+        """Makes a move for the current player and hands the turn over, so it can be undone with pop().
+
+        winner is set when the move completes a line. Searches stop at such positions, so pop() simply
+        clears it again.
+        """
+        self.place(row, col, self.current_player)
+        if self.completes_line(row, col, self.current_player):
+            self.winner = self.current_player
+        self.moves.append((row, col))
+        self.switch_player()
+
+    def pop(self):
+        """Undoes the last move made with push()."""
+        row, col = self.moves.pop()
+        self.switch_player()
+        self.remove(row, col)
+        self.winner = None
+        return row, col
+
+    def is_winning_move(self, row, col, symbol):
+        """Checks if symbol on the empty cell (row, col) would complete a line, without playing it."""
+        return self.completes_line(row, col, symbol)
+
+    def completes_line(self, row, col, symbol):
+        """Checks if the other two cells of a line through (row, col) hold symbol."""
+        board = self.board
+        for (row_1, col_1), (row_2, col_2) in LINE_PARTNERS[3 * row + col]:
+            if board[row_1][col_1] == symbol and board[row_2][col_2] == symbol:
+                return True
+        return False
+
     def check_win(self, player_symbol):
         """Checks if the specified player has won the game."""
         for i in range(3):
@@ -44,15 +130,244 @@ class TicTacToe:
 
     def check_draw(self):
         """Checks if the game is a draw."""
-        return all([self.board[row][col] != " " for row in range(3) for col in range(3)])
+        return self.move_count == 9
+
+    def switch_player(self):
+        """Switches the turn to the other player."""
+        self.current_player = "O" if self.current_player == "X" else "X"
+
+
+# Base-3 state codes: cell (row, col) contributes CELL_DIGITS[symbol] * 3 ** (3 * row + col)
+CELL_DIGITS = {" ": 0, "X": 1, "O": 2}
+POWERS_OF_3 = tuple(3 ** cell for cell in range(9))
+
+# Rows, columns and diagonals as 9-bit masks, with cell (row, col) at bit 3 * row + col
+WIN_MASKS = (0b000000111, 0b000111000, 0b111000000,
+             0b001001001, 0b010010010, 0b100100100,
+             0b100010001, 0b001010100)
+FULL_MASK = 0b111111111
+# WINNING[mask] is True when the cells in mask contain a complete line
+WINNING = [any(mask & line == line for line in WIN_MASKS) for mask in range(FULL_MASK + 1)]
+# LINE_PARTNERS[cell] holds, for every line through cell, the other two cells as (row, col)
+LINE_PARTNERS = tuple(tuple(tuple(divmod(other, 3) for other in range(9) if line >> other & 1 and other != cell)
+                            for line in WIN_MASKS if line >> cell & 1) for cell in range(9))
+# OPEN_CELLS[mask] lists the cells in mask as (row, col), in row-major order
+OPEN_CELLS = [tuple(divmod(cell, 3) for cell in range(9) if mask >> cell & 1) for mask in range(FULL_MASK + 1)]
+# TERNARY[mask] is the base-3 code of a board with a 1 in every cell of mask
+TERNARY = [sum(POWERS_OF_3[cell] for cell in range(9) if mask >> cell & 1) for mask in range(FULL_MASK + 1)]
+
+
+def _symmetry(transform):
+    """Returns the cell permutation of a board transform, so that cell i moves to cell perm[i]."""
+    return tuple(3 * new_row + new_col for new_row, new_col in (transform(cell // 3, cell % 3) for cell in range(9)))
+
+
+# The 8 rotations and reflections of the board as cell permutations, identity first
+SYMMETRIES = tuple(_symmetry(transform) for transform in (
+    lambda row, col: (row, col),
+    lambda row, col: (col, 2 - row),
+    lambda row, col: (2 - row, 2 - col),
+    lambda row, col: (2 - col, row),
+    lambda row, col: (row, 2 - col),
+    lambda row, col: (2 - row, col),
+    lambda row, col: (col, row),
+    lambda row, col: (2 - col, 2 - row),
+))
+# INVERSE_SYMMETRIES[t][perm[i]] == i for perm = SYMMETRIES[t]
+INVERSE_SYMMETRIES = tuple(tuple(perm.index(cell) for cell in range(9)) for perm in SYMMETRIES)
+
+
+def state_code(board):
+    """Encodes a board as a base-3 integer below 3 ** 9."""
+    return sum(CELL_DIGITS[board[cell // 3][cell % 3]] * POWERS_OF_3[cell] for cell in range(9))
+
+
+def place_state_code(game, code):
+    """Places the pieces of the board with this state code on an empty game."""
+    for cell in range(9):
+        digit = code // POWERS_OF_3[cell] % 3
+        if digit:
+            game.place(cell // 3, cell % 3, " XO"[digit])
+
+
+def symmetric_codes(code):
+    """Returns the codes of the 8 symmetric images of a state, in SYMMETRIES order."""
+    digits = [code // POWERS_OF_3[cell] % 3 for cell in range(9)]
+    return [sum(digits[cell] * POWERS_OF_3[perm[cell]] for cell in range(9)) for perm in SYMMETRIES]
+
+
+def canonical_code(code):
+    """Returns the smallest code among the 8 symmetric images of a state, and the index of the symmetry that gives it."""
+    images = symmetric_codes(code)
+    best_symmetry = images.index(min(images))
+    return images[best_symmetry], best_symmetry
+
+
+def canonical_board(board):
+    """Returns the smallest of the 8 symmetric images of a board as a tuple of row tuples, and the index of its symmetry."""
+    cells = [cell for row in board for cell in row]
+    best_board, best_symmetry = None, 0
+    for index, inverse in enumerate(INVERSE_SYMMETRIES):
+        image = [cells[cell] for cell in inverse]
+        image = (tuple(image[0:3]), tuple(image[3:6]), tuple(image[6:9]))
+        if best_board is None or image < best_board:
+            best_board, best_symmetry = image, index
+    return best_board, best_symmetry
+
+
+class _BitboardRow:
+    """A single row of a BitboardTicTacToe board, readable and writable like a list of symbols."""
+    def __init__(self, game, row):
+        self.game = game
+        self.row = row
+
+    def __getitem__(self, col):
+        bit = 1 << (3 * self.row + col)
+        if self.game.masks["X"] & bit:
+            return "X"
+        if self.game.masks["O"] & bit:
+            return "O"
+        return " "
+
+    def __setitem__(self, col, symbol):
+        if self[col] != " ":
+            self.game.remove(self.row, col)
+        if symbol != " ":
+            self.game.place(self.row, col, symbol)
+
+    def __iter__(self):
+        return (self[col] for col in range(3))
+
+    def __len__(self):
+        return 3
+
+
+class BitboardTicTacToe:
+    """Tic Tac Toe backed by one 9-bit mask per player.
+
+    Win and draw checks are single table lookups. `board` is a row-major view over the masks so
+    players written against `TicTacToe` keep working unchanged.
+    """
+    def __init__(self):
+        """Initialize the Tic Tac Toe bitboards."""
+        self.masks = {"X": 0, "O": 0}
+        self.hash = 0  # Zobrist hash of the board, the same as TicTacToe.hash
+        self.moves = []  # Cells played through push(), used by pop()
+        self.winner = None  # Symbol of the player whose last move completed a line
+        self.board = [_BitboardRow(self, row) for row in range(3)]
+        self.current_player = "X"
+        self.beginning = True
+
+    @classmethod
+    def to_string(cls) -> str:
+        return "ttt"
+
+    def reset(self):
+        """Clears the bitboards for a new game."""
+        self.masks["X"] = self.masks["O"] = 0
+        self.hash = 0
+        self.moves.clear()
+        self.winner = None
+        self.current_player = "X"
+        self.beginning = True
+
+    def print_board(self):
+        """Prints the Tic Tac Toe board."""
+        for row in self.board:
+            print("|".join(row))
+            print("-" * 5)
+        print()
+
+    def user_input(self, row, col):
+        """Allows the player to place their mark on the board based on the given row and column."""
+        if self.is_valid_move(row, col):
+            self.place(row, col, self.current_player)
+            if WINNING[self.masks[self.current_player]]:
+                self.winner = self.current_player
+                return True, self.current_player
+            elif self.check_draw():
+                return True, None
+            self.switch_player()
+        else:
+            print("Invalid move. Please try again.")
+        return False, None
+
+    def is_valid_move(self, row, col):
+        """Checks if the given cell is on the board and empty."""
+        return 0 <= row < 3 and 0 <= col < 3 and bool(self.empty_mask >> (3 * row + col) & 1)
+
+    def available_moves(self):
+        """Returns the empty cells as (row, col) tuples in row-major order."""
+        return OPEN_CELLS[self.empty_mask]
+
+    def place(self, row, col, symbol):
+        """Puts symbol on an empty cell, like TicTacToe.place()."""
+        self.masks[symbol] |= 1 << (3 * row + col)
+        self.hash ^= TTT_KEYS[3 * row + col][symbol]
+
+    def remove(self, row, col):
+        """Clears a cell, undoing place()."""
+        bit = 1 << (3 * row + col)
+        symbol = "X" if self.masks["X"] & bit else "O"
+        self.masks[symbol] &= ~bit
+        self.hash ^= TTT_KEYS[3 * row + col][symbol]
+
+    def is_winning_move(self, row, col, symbol):
+        """Checks if symbol on the empty cell (row, col) would complete a line, without playing it."""
+        return WINNING[self.masks[symbol] | 1 << (3 * row + col)]
+
+    @property
+    def code(self):
+        """Base-3 state code of the board, see state_code()."""
+        return TERNARY[self.masks["X"]] + 2 * TERNARY[self.masks["O"]]
+
+    @property
+    def empty_mask(self):
+        """Empty cells as a 9-bit mask."""
+        return FULL_MASK & ~(self.masks["X"] | self.masks["O"])
+
+    @property
+    def move_count(self):
+        """Number of marks on the board."""
+        return 9 - len(OPEN_CELLS[self.empty_mask])
+
+    def push(self, row, col):
+        """Makes a move for the current player and hands the turn over, so it can be undone with pop()."""
+        # Inlined place(), as search calls push() and pop() at every node
+        symbol = self.current_player
+        cell = 3 * row + col
+        mask = self.masks[symbol] | 1 << cell
+        self.masks[symbol] = mask
+        self.hash ^= TTT_KEYS[cell][symbol]
+        if WINNING[mask]:
+            self.winner = symbol
+        self.moves.append(cell)
+        self.current_player = "O" if symbol == "X" else "X"
+
+    def pop(self):
+        """Undoes the last move made with push()."""
+        cell = self.moves.pop()
+        symbol = self.current_player = "O" if self.current_player == "X" else "X"
+        self.masks[symbol] &= ~(1 << cell)
+        self.hash ^= TTT_KEYS[cell][symbol]
+        self.winner = None
+        return divmod(cell, 3)
+
+    def check_win(self, player_symbol):
+        """Checks if the specified player has won the game."""
+        return WINNING[self.masks[player_symbol]]
+
+    def check_draw(self):
+        """Checks if the game is a draw."""
+        return (self.masks["X"] | self.masks["O"]) == FULL_MASK
 
     def switch_player(self):
         """Switches the turn to the other player."""
         self.current_player = "O" if self.current_player == "X" else "X"
 
 
-def play_tic_tac_toe(player_x, player_o, display_board=True):
-    game = TicTacToe()
+def play_tic_tac_toe(player_x, player_o, display_board=True, game_class=TicTacToe):
+    game = game_class()
     while True:
         if display_board:
             print(f"{game.current_player}'s Turn")
@@ -67,4 +382,30 @@ def play_tic_tac_toe(player_x, player_o, display_board=True):
             if display_board:
                 game.print_board()
         except ValueError:
-            print("Invalid input. Please enter numbers between 0 and 2.")
\ No newline at end of file
+            print("Invalid input. Please enter numbers between 0 and 2.")
+
+
+def simulate(player_x, player_o, n_games, game_class=TicTacToe, seeds=None):
+    """Plays n_games games without any output on one reused board.
+
+    Returns a (winner, length, moves) tuple per game, winner being None for a draw and moves a list
+    of (row, col). An invalid move raises ValueError instead of being retried.
+    With seeds, random is seeded with seeds[i] before game i, so that any game can be replayed alone.
+    """
+    game = game_class()
+    players = {"X": player_x, "O": player_o}
+    results = []
+    for index in range(n_games):
+        if seeds is not None:
+            random.seed(seeds[index])
+        game.reset()
+        moves = []
+        game_over = False
+        while not game_over:
+            row, col = players[game.current_player].input(game)
+            if not game.is_valid_move(row, col):
+                raise ValueError(f"Invalid move {(row, col)!r} by {game.current_player}")
+            moves.append((row, col))
+            game_over, winner = game.user_input(row, col)
+        results.append((winner, len(moves), moves))
+    return results
@@ -0,0 +1,22 @@
+import random
+
+
+def zobrist_keys(num_cells, seed=0):
+    """Returns one random 64-bit key per cell and symbol, indexed as keys[cell][symbol]."""
+    rng = random.Random(seed)
+    return [{"X": rng.getrandbits(64), "O": rng.getrandbits(64)} for _ in range(num_cells)]
+
+
+def hash_board(board, keys):
+    """Computes the Zobrist hash of a board from scratch by XOR-ing the keys of every occupied cell."""
+    cols = len(board[0])
+    value = 0
+    for row, cells in enumerate(board):
+        for col, symbol in enumerate(cells):
+            if symbol != " ":
+                value ^= keys[row * cols + col][symbol]
+    return value
+
+
+CONNECT4_KEYS = zobrist_keys(6 * 7, seed=4)
+TTT_KEYS = zobrist_keys(3 * 3, seed=3)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from game.batch import X
+
+
+class BatchRandomPlayer:
+    """Picks a uniformly random legal move in every game of a batch."""
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def actions(self, env):
+        legal = env.legal_moves()
+        return np.argmax(self.rng.random(legal.shape) * legal, axis=1)
+
+
+class BatchEpsilonGreedyPlayer:
+    """Epsilon-greedy over batched Q-values.
+
+    q_values(env) must return an (N, num_actions) array. Ties between greedy moves are broken at random.
+    """
+    def __init__(self, q_values, exploration_rate=0.3, rng=None):
+        self.q_values = q_values
+        self.exploration_rate = exploration_rate
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def actions(self, env):
+        legal = env.legal_moves()
+        noise = self.rng.random(legal.shape)
+        q_values = np.where(legal, self.q_values(env), -np.inf)
+        best = q_values == q_values.max(axis=1, keepdims=True)
+        greedy = np.argmax(noise * best, axis=1)
+        explore = np.argmax(noise * legal, axis=1)
+        return np.where(self.rng.random(env.num_games) < self.exploration_rate, explore, greedy)
+
+
+def play_batch(env, player_x, player_o, num_games):
+    """Plays num_games games on a batch environment and returns the win counts and average game length.
+
+    Both players are asked for a move in every game on every step and the move of the player to move
+    is kept, so games that reset on their own keep running alongside the others.
+    """
+    win_count = {"X": 0, "O": 0, "Draw": 0}
+    total_length = finished = 0
+    while finished < num_games:
+        actions = np.where(env.current == X, player_x.actions(env), player_o.actions(env))
+        done, winners, lengths = env.step(actions)
+        done_count = min(int(done.sum()), num_games - finished)
+        winners, lengths = winners[done][:done_count], lengths[done][:done_count]
+        win_count["X"] += int((winners == X).sum())
+        win_count["O"] += int((winners == -X).sum())
+        win_count["Draw"] += int((winners == 0).sum())
+        total_length += int(lengths.sum())
+        finished += done_count
+    return win_count, total_length / num_games
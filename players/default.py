@@ -23,20 +23,14 @@ class TTTDefaultPlayer:
 
     def block_opponent_win(self, game):
         """Identify and execute a blocking move to prevent the opponent from winning."""
-        for row in range(3):
-            for col in range(3):
-                if game.board[row][col] == " ":
-                    game.board[row][col] = self.opponent_symbol
-                    if game.check_win(self.opponent_symbol):
-                        game.board[row][col] = " "
-                        return row, col
-                    game.board[row][col] = " "
+        for row, col in game.available_moves():
+            if game.is_winning_move(row, col, self.opponent_symbol):
+                return row, col
         return None
 
     def random_move(self, game):
         """Make a random move if no blocking move is available."""
-        available_actions = [(row, col) for row in range(3) for col in range(3) if game.board[row][col] == " "]
-        return random.choice(available_actions)
+        return random.choice(game.available_moves())
 
 
 class Connect4DefaultPlayer:
@@ -62,17 +56,11 @@ class Connect4DefaultPlayer:
 
     def block_opponent_win(self, game):
         """Identify and execute a blocking move to prevent the opponent from winning."""
-        for col in range(7):
-            for row in range(5, -1, -1):
-                if game.board[row][col] == " ":
-                    game.board[row][col] = self.opponent_symbol
-                    if game.check_win(self.opponent_symbol):
-                        game.board[row][col] = " "
-                        return col
-                    game.board[row][col] = " "
+        for col in game.get_possible_columns():
+            if game.is_winning_move(col, self.opponent_symbol):
+                return col
         return None
 
     def random_move(self, game):
         """Make a random move if no blocking move is available."""
-        available_columns = [col for col in range(7) if game.board[0][col] == " "]
-        return random.choice(available_columns)
+        return random.choice(game.get_possible_columns())
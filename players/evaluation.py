@@ -0,0 +1,98 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from game.connect4 import simulate as simulate_connect4
+from game.ttt import simulate as simulate_tic_tac_toe
+
+SIMULATORS = {"ttt": simulate_tic_tac_toe, "connect4": simulate_connect4}
+OUTCOMES = ("X", "O", "Draw")
+
+# Set in each worker process by _init_worker
+_players = {}
+
+
+def game_seed(seed, index):
+    """Returns the seed of game number index, so every game replays the same whatever the batching."""
+    return seed * 2 ** 32 + index
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """Returns the Wilson score interval (low, high) of a binomial rate, (0, 1) without trials."""
+    if not trials:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def _init_worker(player_x, player_o, game_class):
+    """Receives the players once per worker instead of with every batch."""
+    _players.update(x=player_x, o=player_o, game_class=game_class)
+
+
+def _play_batch(seed, start, count, player_x=None, player_o=None, game_class=None):
+    """Plays games start to start + count - 1, each from its own seed, and returns the outcome counts."""
+    if player_x is None:
+        player_x, player_o, game_class = _players["x"], _players["o"], _players["game_class"]
+    simulate = SIMULATORS[game_class.to_string()]
+    counts = dict.fromkeys(OUTCOMES, 0)
+    seeds = [game_seed(seed, index) for index in range(start, start + count)]
+    for winner, _, _ in simulate(player_x, player_o, count, game_class, seeds):
+        counts[winner or "Draw"] += 1
+    return counts
+
+
+def _summary(counts, stopped_early, z):
+    games = sum(counts.values())
+    return {"games": games, "stopped_early": stopped_early, "counts": counts,
+            "rates": {outcome: counts[outcome] / games if games else 0.0 for outcome in OUTCOMES},
+            "intervals": {outcome: wilson_interval(counts[outcome], games, z) for outcome in OUTCOMES}}
+
+
+def evaluate(player_x, player_o, game_class, num_games=1000, seed=0, max_workers=None, batch_size=100,
+             stop_width=None, z=1.96):
+    """Plays up to num_games games of player_x against player_o and returns their outcome statistics.
+
+    Works for any game in SIMULATORS. Game i is seeded with game_seed(seed, i), and games are played
+    in batches of batch_size on max_workers processes (all cores for None), or in this process when
+    max_workers is 1. The players are sent to each worker once. With stop_width, evaluation stops at
+    the first batch after which the Wilson interval of every outcome is narrower than stop_width.
+    Batches are counted in order, so the result depends only on the seed and batch_size, not on the
+    number of workers.
+
+    Returns {"games", "stopped_early", "counts", "rates", "intervals"}, the last three keyed by
+    "X", "O" and "Draw", with intervals as (low, high) at the confidence level of z.
+    """
+    batches = [(start, min(batch_size, num_games - start)) for start in range(0, num_games, batch_size)]
+    counts = dict.fromkeys(OUTCOMES, 0)
+
+    def add(batch_counts):
+        for outcome in OUTCOMES:
+            counts[outcome] += batch_counts[outcome]
+        if stop_width is None:
+            return False
+        games = sum(counts.values())
+        return all(high - low < stop_width for low, high in
+                   (wilson_interval(counts[outcome], games, z) for outcome in OUTCOMES))
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        for done, (start, count) in enumerate(batches, 1):
+            if add(_play_batch(seed, start, count, player_x, player_o, game_class)):
+                return _summary(counts, done < len(batches), z)
+        return _summary(counts, False, z)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(player_x, player_o, game_class)) as executor:
+        # Keep one wave of batches in flight, so that little work is wasted when stopping early
+        for wave in range(0, len(batches), max_workers):
+            futures = [executor.submit(_play_batch, seed, start, count) for start, count in batches[wave:wave + max_workers]]
+            for done, future in enumerate(futures, wave + 1):
+                if add(future.result()):
+                    for pending in futures:
+                        pending.cancel()
+                    return _summary(counts, done < len(batches), z)
+    return _summary(counts, False, z)
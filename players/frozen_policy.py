@@ -0,0 +1,118 @@
+import operator
+import random
+import struct
+
+import numpy as np
+
+from game.ttt import OPEN_CELLS
+from players.qtable import attach_arrays, share_arrays
+
+# MOVE_SETS[game][mask] is the tuple of moves in a move mask with bit 3 * row + col set for Tic Tac Toe's
+# (row, col) and bit col for Connect4's columns
+MOVE_SETS = {"ttt": OPEN_CELLS,
+             "connect4": [tuple(col for col in range(7) if mask >> col & 1) for mask in range(1 << 7)]}
+LEGAL_MOVES = {"ttt": operator.methodcaller("available_moves"),
+               "connect4": operator.methodcaller("get_possible_columns")}
+
+# Policy file header: magic, version, entry count, game name; padded to 32 bytes and followed by the
+# sorted keys and then the move masks
+POLICY_MAGIC = b"QPOL"
+POLICY_VERSION = 1
+POLICY_HEADER = struct.Struct("<4sIQ16s")
+POLICY_HEADER_SIZE = 32
+
+
+def policy_path(checkpoint_path):
+    """Returns where the players' save() writes the FrozenPolicy that goes with a Q-table checkpoint."""
+    return checkpoint_path + ".policy"
+
+
+class FrozenPolicy:
+    """Plays the greedy moves of a trained Q-learning player without its Q-table.
+
+    keys holds, sorted, the Zobrist hash (game.hash, which the games keep up to date) of every position
+    the Q-table covers, and masks the matching bitmask of equally good legal moves in board orientation,
+    so a move is one binary search in two flat arrays that can be shared between processes. Positions
+    the table never saw, and exploration moves when exploration_rate is set, are random legal moves.
+    Built by the players' frozen_policy().
+    """
+    def __init__(self, symbol, game_name, keys, masks, exploration_rate=0.0, shared_memory=None, path=None):
+        self.symbol = symbol
+        self.game_name = game_name  # "ttt" or "connect4", selects MOVE_SETS and LEGAL_MOVES
+        self.keys = keys
+        self.masks = masks
+        self.exploration_rate = exploration_rate
+        self.move_sets = MOVE_SETS[game_name]
+        self.legal_moves = LEGAL_MOVES[game_name]
+        self.shared_memory = shared_memory  # Keeps an attached shared memory block alive
+        self.path = path  # The file the arrays are memory-mapped from, set by load()
+
+    @classmethod
+    def from_moves(cls, symbol, game_name, moves, exploration_rate=0.0):
+        """Builds a policy from a {position hash: move mask} dict."""
+        keys = np.array(sorted(moves), dtype=np.uint64)
+        masks = np.array([moves[key] for key in keys.tolist()], dtype=np.uint16)
+        return cls(symbol, game_name, keys, masks, exploration_rate)
+
+    @classmethod
+    def to_string(cls) -> str:
+        return "qlearning"
+
+    def __len__(self):
+        return len(self.keys)
+
+    def input(self, game):
+        if game.beginning:
+            game.beginning = False
+        if not self.exploration_rate or random.random() >= self.exploration_rate:
+            # A Python int key would make searchsorted convert the whole array, so pass a uint64
+            index = int(self.keys.searchsorted(np.uint64(game.hash)))
+            if index < len(self.keys) and self.keys.item(index) == game.hash:
+                moves = self.move_sets[self.masks.item(index)]
+                return moves[0] if len(moves) == 1 else random.choice(moves)
+        return random.choice(self.legal_moves(game))
+
+    def save(self, path):
+        """Writes the policy as a header, the sorted keys and the move masks, for load() to memory-map."""
+        header = POLICY_HEADER.pack(POLICY_MAGIC, POLICY_VERSION, len(self.keys), self.game_name.encode())
+        with open(path, "wb") as policy_file:
+            policy_file.write(header.ljust(POLICY_HEADER_SIZE, b"\0"))
+            policy_file.write(np.ascontiguousarray(self.keys, dtype=np.uint64).tobytes())
+            policy_file.write(np.ascontiguousarray(self.masks, dtype=np.uint16).tobytes())
+
+    @classmethod
+    def load(cls, path, symbol, exploration_rate=0.0):
+        """Memory-maps a policy written by save(), so opening it costs the same whatever its size."""
+        with open(path, "rb") as policy_file:
+            magic, version, count, game_name = POLICY_HEADER.unpack(policy_file.read(POLICY_HEADER.size))
+        if magic != POLICY_MAGIC or version != POLICY_VERSION:
+            raise ValueError(f"{path} is not a version {POLICY_VERSION} policy file.")
+        if count:
+            keys = np.memmap(path, dtype=np.uint64, mode="r", offset=POLICY_HEADER_SIZE, shape=(count,))
+            masks = np.memmap(path, dtype=np.uint16, mode="r", offset=POLICY_HEADER_SIZE + keys.nbytes, shape=(count,))
+        else:
+            keys, masks = np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint16)
+        return cls(symbol, game_name.rstrip(b"\0").decode(), keys, masks, exploration_rate, path=path)
+
+    def to_shared_memory(self):
+        """Copies the policy's arrays into a new shared memory block.
+
+        Returns the policy backed by the block and a small picklable handle for attach(). The caller owns
+        the block and must call unlink() on the returned policy once no process needs it any more.
+        """
+        block, (keys, masks), arrays_handle = share_arrays((self.keys, self.masks))
+        policy = FrozenPolicy(self.symbol, self.game_name, keys, masks, self.exploration_rate, shared_memory=block)
+        return policy, (self.symbol, self.game_name, self.exploration_rate, arrays_handle)
+
+    @classmethod
+    def attach(cls, handle):
+        """Opens a policy created by to_shared_memory() in another process, without copying it."""
+        symbol, game_name, exploration_rate, arrays_handle = handle
+        block, (keys, masks) = attach_arrays(arrays_handle)
+        return cls(symbol, game_name, keys, masks, exploration_rate, shared_memory=block)
+
+    def unlink(self):
+        """Frees the shared memory block behind a policy returned by to_shared_memory()."""
+        self.keys = self.masks = None
+        self.shared_memory.close()
+        self.shared_memory.unlink()
@@ -0,0 +1,47 @@
+ROWS, COLS = 6, 7
+
+
+def _connect4_windows():
+    """Lists every line of four cells on the Connect4 board as flat cell indices (row * COLS + col)."""
+    windows = []
+    for row in range(ROWS):
+        for col in range(COLS):
+            for row_dir, col_dir in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_row, end_col = row + 3 * row_dir, col + 3 * col_dir
+                if 0 <= end_row < ROWS and 0 <= end_col < COLS:
+                    windows.append(tuple((row + i * row_dir) * COLS + col + i * col_dir for i in range(4)))
+    return tuple(windows)
+
+
+CONNECT4_WINDOWS = _connect4_windows()  # 69 windows
+WINDOW_WEIGHTS = (0, 1, 5, 25)  # Score of a window holding 0-3 marks of one player and none of the other
+CENTER_WEIGHT = 3
+CENTER_CELLS = tuple(row * COLS + COLS // 2 for row in range(ROWS))
+SCALE = 200  # Larger values keep more positions away from the +-1 reserved for wins
+
+
+def connect4_window_score(game, symbol):
+    """Scores a Connect4 position for symbol by counting open twos and threes, as a value in (-1, 1).
+
+    Each window of four that only one player has marks in counts for that player. Marks in the center
+    column get a small bonus. The raw score is squashed below 1 so that a real win always outranks it.
+    """
+    cells = [cell for row in game.board for cell in row]
+    score = 0
+    for window in CONNECT4_WINDOWS:
+        mine = theirs = 0
+        for cell in window:
+            if cells[cell] == symbol:
+                mine += 1
+            elif cells[cell] != " ":
+                theirs += 1
+        if not theirs:
+            score += WINDOW_WEIGHTS[mine]
+        elif not mine:
+            score -= WINDOW_WEIGHTS[theirs]
+    for cell in CENTER_CELLS:
+        if cells[cell] == symbol:
+            score += CENTER_WEIGHT
+        elif cells[cell] != " ":
+            score -= CENTER_WEIGHT
+    return score / (abs(score) + SCALE)
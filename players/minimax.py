@@ -1,10 +1,29 @@
 import random
+import time
+
+from players.solver import load_solution
+from players.transposition import EXACT, LOWER, UPPER
+
+
+def probe_solution(player, game):
+    """Returns the move the player's full-tree search would pick, read from the shared TTTSolution, or None
+    to search instead.
+
+    Searching every move scores wins, draws and losses alike however far away they are, and keeps the
+    first best move in row-major order, so that move is the smallest of the solution's optimal moves.
+    """
+    if not player.use_solution or player.symbol != ("X" if game.move_count % 2 == 0 else "O"):
+        return None  # The solution only covers positions where the side to move follows from the counts
+    _, moves = load_solution().lookup(game.board)
+    return min(moves) if moves else None
 
 
 class TTTMinimaxPlayer:
-    def __init__(self, symbol):
+    def __init__(self, symbol, stats=None, use_solution=True):
         self.symbol = symbol
         self.opponent_symbol = "O" if symbol == "X" else "X"
+        self.stats = stats  # Optional SearchStats
+        self.use_solution = use_solution  # Answer from the precomputed TTTSolution and only search without it
 
     def input(self, game):
         """Determine the best move using the Minimax algorithm."""
@@ -12,46 +31,57 @@ class TTTMinimaxPlayer:
             game.beginning = False
             return random.choice([(i, j) for i in range(3) for j in range(3)])  # Choose a random move
         else:
-            _, best_move = self.minimax(game, True)
+            if self.stats is not None:
+                self.stats.start_move()
+            best_move = probe_solution(self, game)
+            if best_move is None:
+                _, best_move = self.minimax(game, True)
+            if self.stats is not None:
+                self.stats.end_move()
             return best_move
 
     @classmethod
     def to_string(cls) -> str:
         return "minimax"
 
-    def minimax(self, game, is_maximizing):
-        if game.check_win(self.symbol):  # Check if self.symbol has won
+    def minimax(self, game, is_maximizing, ply=0):
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, ply)
+        if game.winner == self.symbol:  # Check if self.symbol has won
+            if stats is not None:
+                stats.leaves += 1
             return (1, None)
-        elif game.check_win(self.opponent_symbol):  # Check if self.opponent_symbol has won
+        elif game.winner is not None:  # Check if self.opponent_symbol has won
+            if stats is not None:
+                stats.leaves += 1
             return (-1, None)
         elif game.check_draw():
+            if stats is not None:
+                stats.leaves += 1
             return (0, None)
 
         best_move = None
-        if is_maximizing:
-            best_score = -float('inf')
-            symbol = self.symbol
-        else:
-            best_score = float('inf')
-            symbol = self.opponent_symbol
-
-        for row in range(3):
-            for col in range(3):
-                if game.board[row][col] == " ":
-                    game.board[row][col] = symbol
-                    score, _ = self.minimax(game, not is_maximizing)
-                    game.board[row][col] = " "
-                    if is_maximizing and score > best_score:
-                        best_score, best_move = score, (row, col)
-                    elif not is_maximizing and score < best_score:
-                        best_score, best_move = score, (row, col)
+        best_score = -float('inf') if is_maximizing else float('inf')
+
+        for row, col in game.available_moves():
+            game.push(row, col)
+            score, _ = self.minimax(game, not is_maximizing, ply + 1)
+            game.pop()
+            if is_maximizing and score > best_score:
+                best_score, best_move = score, (row, col)
+            elif not is_maximizing and score < best_score:
+                best_score, best_move = score, (row, col)
         return best_score, best_move
 
 
 class TTTMinimaxABPPlayer:
-    def __init__(self, symbol):
+    def __init__(self, symbol, stats=None, use_solution=True):
         self.symbol = symbol
         self.opponent_symbol = "O" if symbol == "X" else "X"
+        self.stats = stats  # Optional SearchStats
+        self.use_solution = use_solution  # Answer from the precomputed TTTSolution and only search without it
 
     def input(self, game):
         """Determine the best move using the Minimax algorithm with Alpha-Beta Pruning."""
@@ -59,64 +89,139 @@ class TTTMinimaxABPPlayer:
             game.beginning = False
             return random.choice([(i, j) for i in range(3) for j in range(3)])  # Choose a random move
         else:
-            _, best_move = self.minimax(game, True, -float('inf'), float('inf'))
+            if self.stats is not None:
+                self.stats.start_move()
+            best_move = probe_solution(self, game)
+            if best_move is None:
+                _, best_move = self.minimax(game, True, -float('inf'), float('inf'))
+            if self.stats is not None:
+                self.stats.end_move()
             return best_move
 
     @classmethod
     def to_string(cls) -> str:
         return "minimax_abp"
 
-    def minimax(self, game, is_maximizing, alpha, beta):
+    def minimax(self, game, is_maximizing, alpha, beta, ply=0):
         """Minimax algorithm with Alpha-Beta Pruning to evaluate the best move."""
-        if game.check_win(self.symbol):  # Check if self.symbol has won
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, ply)
+        if game.winner == self.symbol:  # Check if self.symbol has won
+            if stats is not None:
+                stats.leaves += 1
             return (1, None)
-        elif game.check_win(self.opponent_symbol):  # Check if opponent has won
+        elif game.winner is not None:  # Check if opponent has won
+            if stats is not None:
+                stats.leaves += 1
             return (-1, None)
         elif game.check_draw():
+            if stats is not None:
+                stats.leaves += 1
             return (0, None)
 
         best_move = None
-        if is_maximizing:
-            best_score = -float('inf')
-            symbol = self.symbol
-        else:
-            best_score = float('inf')
-            symbol = self.opponent_symbol
-
-        for row in range(3):
-            for col in range(3):
-                if game.board[row][col] == " ":
-                    game.board[row][col] = symbol
-                    score, _ = self.minimax(game, not is_maximizing, alpha, beta)
-                    game.board[row][col] = " "
-                    if is_maximizing:
-                        if score > best_score:
-                            best_score, best_move = score, (row, col)
-                        alpha = max(alpha, score)
-                        if alpha >= beta:
-                            break
-                    else:
-                        if score < best_score:
-                            best_score, best_move = score, (row, col)
-                        beta = min(beta, score)
-                        if beta <= alpha:
-                            break
+        best_score = -float('inf') if is_maximizing else float('inf')
+
+        for move_index, (row, col) in enumerate(game.available_moves()):
+            game.push(row, col)
+            score, _ = self.minimax(game, not is_maximizing, alpha, beta, ply + 1)
+            game.pop()
+            if is_maximizing:
+                if score > best_score:
+                    best_score, best_move = score, (row, col)
+                alpha = max(alpha, score)
+            else:
+                if score < best_score:
+                    best_score, best_move = score, (row, col)
+                beta = min(beta, score)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoff(move_index)
+                break
         return best_score, best_move
 
 
+# Columns ordered from the center outwards; central moves take part in more lines and are usually best
+CENTER_FIRST = (3, 2, 4, 1, 5, 0, 6)
+
+
+def deepening_search(player, search_depth):
+    """Searches at player.max_depth, or deepens one ply at a time while player.time_limit_ms allows.
+
+    search_depth(depth) runs one complete search and returns (score, move). The player's minimax sets
+    player.timed_out once the deadline passes, and the unfinished iteration is then discarded. The depth
+    reached, nodes searched and time taken are recorded in player.last_search.
+    """
+    start = time.perf_counter()
+    if player.stats is not None:
+        player.stats.start_move()
+    player.nodes = 0
+    player.timed_out = False
+    if player.time_limit_ms is None:
+        player.deadline = None
+        depths = [player.max_depth]
+    else:
+        player.deadline = start + player.time_limit_ms / 1000
+        depths = range(1, player.max_depth + 1)
+
+    best_move, reached = None, 0
+    for depth in depths:
+        player.root_depth = depth
+        score, move = search_depth(depth)
+        if player.timed_out:
+            if best_move is None:
+                best_move = move  # Best guess from the first, unfinished iteration
+            break
+        best_move, reached = move, depth
+        if abs(score) == 1:
+            break  # A forced result does not change with more depth
+
+    player.last_search = {"depth": reached, "nodes": player.nodes, "time_ms": (time.perf_counter() - start) * 1000}
+    if player.stats is not None:
+        player.stats.end_move()
+    return best_move
+
+
+def probe_opening_book(player, game):
+    """Returns the best move of player.opening_book for the current position, or None to search instead."""
+    if player.opening_book is None:
+        return None
+    found = player.opening_book.probe(game)
+    if found is None:
+        return None
+    game.beginning = False
+    return found[1]
+
+
 class Connect4MinimaxPlayer:
-    def __init__(self, symbol, max_depth=5):
+    def __init__(self, symbol, max_depth=5, time_limit_ms=None, evaluate=None, stats=None, opening_book=None):
         self.symbol = symbol
         self.opponent_symbol = "O" if symbol == "X" else "X"
         self.max_depth = max_depth
+        self.evaluate = evaluate  # evaluate(game, symbol) -> score in (-1, 1) for positions at the depth limit
+        self.time_limit_ms = time_limit_ms  # Per-move budget; enables iterative deepening up to max_depth
+        self.stats = stats  # Optional SearchStats
+        self.opening_book = opening_book  # Optional OpeningBook, consulted before searching
+        self.deadline = None
+        self.timed_out = False
+        self.nodes = 0
+        self.root_depth = 0
+        self.last_search = None  # Depth reached, nodes and time of the last search
 
     def input(self, game):
         """Determine the best move using the Minimax algorithm."""
+        book_move = probe_opening_book(self, game)
+        if book_move is not None:
+            return book_move
         if game.beginning:
             game.beginning = False
             return random.randint(0, 6)  # Choose a random column
         else:
-            _, best_move = self.minimax(game, True, self.max_depth)
+            best_move = deepening_search(self, lambda depth: self.minimax(game, True, depth))
+            if best_move is None:
+                best_move = game.get_possible_columns()[0]  # Ran out of time before finishing one move
             return best_move
 
     @classmethod
@@ -124,29 +229,44 @@ class Connect4MinimaxPlayer:
         return "minimax"
 
     def minimax(self, game, is_maximizing, depth):
-        if game.check_win(self.symbol):  # Check if self.symbol has won
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            self.timed_out = True
+            return (0, None)
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, self.root_depth - depth)
+
+        if game.winner == self.symbol:  # Check if self.symbol has won
+            if stats is not None:
+                stats.leaves += 1
             return (1, None)
-        elif game.check_win(self.opponent_symbol):  # Check if self.opponent_symbol has won
+        elif game.winner is not None:  # Check if self.opponent_symbol has won
+            if stats is not None:
+                stats.leaves += 1
             return (-1, None)
         elif game.check_draw():
+            if stats is not None:
+                stats.leaves += 1
             return (0, None)
         elif depth == 0:
+            if stats is not None:
+                stats.leaves += 1
+            if self.evaluate is not None:
+                return (self.evaluate(game, self.symbol), None)
             return (0, None)  # Return 0 score if reached max depth
 
         best_move = None
-        if is_maximizing:
-            best_score = -float('inf')
-            symbol = self.symbol
-        else:
-            best_score = float('inf')
-            symbol = self.opponent_symbol
+        best_score = -float('inf') if is_maximizing else float('inf')
 
-        for col in range(7):
-            if game.board[0][col] == " ":  # Check if the column is not full
-                row = game.get_next_open_row(col)
-                game.board[row][col] = symbol
+        for col in CENTER_FIRST:
+            if game.is_valid_move(col):  # Check if the column is not full
+                game.push(col)
                 score, _ = self.minimax(game, not is_maximizing, depth - 1)
-                game.board[row][col] = " "
+                game.pop()
+                if self.timed_out:
+                    break
                 if is_maximizing and score > best_score:
                     best_score, best_move = score, col
                 elif not is_maximizing and score < best_score:
@@ -155,59 +275,148 @@ class Connect4MinimaxPlayer:
 
 
 class Connect4MinimaxABPPlayer:
-    def __init__(self, symbol, max_depth=5):
+    def __init__(self, symbol, max_depth=5, transposition_table=None, time_limit_ms=None, evaluate=None, stats=None,
+                 opening_book=None):
         self.symbol = symbol
         self.opponent_symbol = "O" if symbol == "X" else "X"
         self.max_depth = max_depth
+        self.evaluate = evaluate  # evaluate(game, symbol) -> score in (-1, 1) for positions at the depth limit
+        self.transposition_table = transposition_table  # Optional TranspositionTable, kept across moves
+        self.time_limit_ms = time_limit_ms  # Per-move budget; enables iterative deepening up to max_depth
+        self.stats = stats  # Optional SearchStats
+        self.opening_book = opening_book  # Optional OpeningBook, consulted before searching
+        self.deadline = None
+        self.timed_out = False
+        self.nodes = 0
+        self.last_search = None  # Depth reached, nodes and time of the last search
+        self.pv = []  # Principal variation of the last completed iteration
+        self.pv_table = []  # pv_table[ply] is the best line found from the node being searched at ply
+        self.follow_pv = False
+        self.root_depth = 0
 
     def input(self, game):
         """Determine the best move using the Minimax algorithm with Alpha-Beta Pruning."""
+        book_move = probe_opening_book(self, game)
+        if book_move is not None:
+            return book_move
         if game.beginning:
             game.beginning = False
             return random.randint(0, 6)  # Choose a random column
         else:
-            _, best_move = self.minimax(game, True, self.max_depth, -float('inf'), float('inf'))
+            self.pv = []
+            best_move = deepening_search(self, lambda depth: self.search_depth(game, depth))
+            if best_move is None:
+                best_move = game.get_possible_columns()[0]  # Ran out of time before finishing one move
             return best_move
 
     @classmethod
     def to_string(cls) -> str:
         return "minimax_abp"
 
+    def search_depth(self, game, depth):
+        """Runs one full-width search to the given depth, trying the previous principal variation first."""
+        self.root_depth = depth
+        self.follow_pv = True
+        self.pv_table = [[] for _ in range(depth + 1)]
+        score, best_move = self.minimax(game, True, depth, -float('inf'), float('inf'))
+        if not self.timed_out:
+            self.pv = self.pv_table[0]
+        return score, best_move
+
     def minimax(self, game, is_maximizing, depth, alpha, beta):
         """Minimax algorithm with Alpha-Beta Pruning to evaluate the best move."""
-        if game.check_win(self.symbol):  # Check if self.symbol has won
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            self.timed_out = True
+            return (0, None)
+        ply = self.root_depth - depth
+        self.pv_table[ply] = []
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+            stats.max_depth = max(stats.max_depth, ply)
+
+        if game.winner == self.symbol:  # Check if self.symbol has won
+            if stats is not None:
+                stats.leaves += 1
             return (1, None)
-        elif game.check_win(self.opponent_symbol):  # Check if opponent has won
+        elif game.winner is not None:  # Check if opponent has won
+            if stats is not None:
+                stats.leaves += 1
             return (-1, None)
         elif game.check_draw():
+            if stats is not None:
+                stats.leaves += 1
             return (0, None)
         elif depth == 0:
+            if stats is not None:
+                stats.leaves += 1
+            if self.evaluate is not None:
+                return (self.evaluate(game, self.symbol), None)
             return (0, None)  # Return 0 score if reached max depth
 
-        best_move = None
-        if is_maximizing:
-            best_score = -float('inf')
-            symbol = self.symbol
+        table = self.transposition_table
+        first_move = None
+        if self.follow_pv and ply < len(self.pv):
+            first_move = self.pv[ply]
         else:
-            best_score = float('inf')
-            symbol = self.opponent_symbol
+            self.follow_pv = False
+        if table is not None:
+            entry = table.lookup(game.hash)
+            if entry is not None:
+                if stats is not None:
+                    stats.tt_hits += 1
+                _, entry_depth, value, flag, tt_move = entry
+                if entry_depth >= depth and not self.follow_pv:
+                    if flag == EXACT:
+                        return value, tt_move
+                    elif flag == LOWER:
+                        alpha = max(alpha, value)
+                    else:
+                        beta = min(beta, value)
+                    if alpha >= beta:
+                        return value, tt_move
+                if first_move is None:
+                    first_move = tt_move  # Search the best move of the earlier search first
+            window_alpha, window_beta = alpha, beta
+        columns = CENTER_FIRST
+        if first_move is not None:
+            columns = [first_move] + [col for col in CENTER_FIRST if col != first_move]
 
-        for col in range(7):
-            if game.board[0][col] == " ":  # Check if the column is not full
-                row = game.get_next_open_row(col)
-                game.board[row][col] = symbol
+        best_move = None
+        best_score = -float('inf') if is_maximizing else float('inf')
+
+        move_index = 0
+        for col in columns:
+            if game.is_valid_move(col):  # Check if the column is not full
+                game.push(col)
                 score, _ = self.minimax(game, not is_maximizing, depth - 1, alpha, beta)
-                game.board[row][col] = " "
+                game.pop()
+                self.follow_pv = False  # Only the first child of a PV node continues along the PV
+                if self.timed_out:
+                    break
                 if is_maximizing:
                     if score > best_score:
                         best_score, best_move = score, col
+                        self.pv_table[ply] = [col] + self.pv_table[ply + 1]
                     alpha = max(alpha, score)
-                    if alpha >= beta:
-                        break
                 else:
                     if score < best_score:
                         best_score, best_move = score, col
+                        self.pv_table[ply] = [col] + self.pv_table[ply + 1]
                     beta = min(beta, score)
-                    if beta <= alpha:
-                        break
+                if alpha >= beta:
+                    if stats is not None:
+                        stats.cutoff(move_index)
+                    break
+                move_index += 1
+
+        if table is not None and not self.timed_out:
+            if best_score <= window_alpha:
+                flag = UPPER
+            elif best_score >= window_beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            table.store(game.hash, depth, best_score, flag, best_move)
         return best_score, best_move
@@ -0,0 +1,92 @@
+import numpy as np
+
+from game.connect4 import BitboardConnect4, mirror_position_key
+from players.heuristics import connect4_window_score
+from players.minimax import Connect4MinimaxABPPlayer
+from players.transposition import TranspositionTable
+
+# One record per position: the position key and (value + VALUE_STEPS) << 3 | best column
+BOOK_DTYPE = np.dtype([("key", "<u8"), ("entry", "<u2")])
+VALUE_STEPS = 127  # Values in [-1, 1] are stored rounded to multiples of 1 / VALUE_STEPS
+
+
+class OpeningBook:
+    """Searched values and best moves of the early Connect4 positions, looked up by position key.
+
+    Only the smaller of a position's key and its mirror image's key is stored, with the best move of that
+    orientation; lookups mirror the move back when needed. The records are sorted by key so a lookup is
+    a binary search, which also works on a memory-mapped file.
+    """
+    def __init__(self, records):
+        self.records = records
+        self.keys = records["key"]
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def build(cls, max_plies=4, depth=8, evaluate=connect4_window_score, verbose=True):
+        """Searches every position of up to max_plies moves to the given depth."""
+        game = BitboardConnect4()
+        positions = []
+
+        def collect(plies):
+            key = game.position_key()
+            if key <= mirror_position_key(key):
+                positions.append(list(game.moves))
+            if plies < max_plies and game.winner is None:
+                for col in game.get_possible_columns():
+                    game.push(col)
+                    collect(plies + 1)
+                    game.pop()
+
+        collect(0)
+        # Stored scores are from the searching player's point of view, so each side gets its own table
+        tables = {"X": TranspositionTable(), "O": TranspositionTable()}
+        records = np.zeros(len(positions), dtype=BOOK_DTYPE)
+        searched = np.zeros(len(positions), dtype=bool)
+        for index, moves in enumerate(positions):
+            game = BitboardConnect4()
+            for col in moves:
+                game.push(col)
+            if game.winner is not None or game.check_draw():
+                continue
+            player = Connect4MinimaxABPPlayer(game.current_player, max_depth=depth,
+                                              transposition_table=tables[game.current_player], evaluate=evaluate)
+            value, move = player.search_depth(game, depth)
+            records[index] = (game.position_key(), (round(value * VALUE_STEPS) + VALUE_STEPS) << 3 | move)
+            searched[index] = True
+            if verbose and (index + 1) % 100 == 0:
+                print(f"Searched {index + 1} of {len(positions)} positions")
+        records = records[searched]
+        records.sort(order="key")
+        return cls(records)
+
+    def save(self, path):
+        """Writes the records to an .npy file."""
+        np.save(path, self.records)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a book written by save()."""
+        return cls(np.load(path, mmap_mode="r"))
+
+    def lookup(self, key):
+        """Returns (value, best column) for the side to move at the position with this key, or None."""
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index == len(self.keys) or int(self.keys[index]) != key:
+            return None
+        entry = int(self.records["entry"][index])
+        return ((entry >> 3) - VALUE_STEPS) / VALUE_STEPS, entry & 7
+
+    def probe(self, game):
+        """Returns (value, best column) for the current position of a Connect4 game, or None if not in the book."""
+        key = game.position_key()
+        mirrored = mirror_position_key(key)
+        if key <= mirrored:
+            return self.lookup(key)
+        found = self.lookup(mirrored)
+        if found is None:
+            return None
+        value, col = found
+        return value, game.cols - 1 - col
@@ -0,0 +1,103 @@
+import copy
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from players.qleaarning import train_q_learning_players
+from players.telemetry import TrainingTelemetry
+
+ROW_SHAPES = {"ttt": (3, 3), "connect4": (7,)}
+
+
+def _table_deltas(before, after):
+    """Returns {state: flat array of Q-value changes} for the states whose values changed."""
+    deltas = {}
+    for state, row in after.items():
+        values = np.ravel(np.asarray(row, dtype=np.float64))
+        base = before.get(state)
+        if base is not None:
+            values = values - np.ravel(np.asarray(base, dtype=np.float64))
+        if values.any():
+            deltas[state] = values
+    return deltas
+
+
+def _train_worker(ql_player_x, ql_player_o, game_class, num_episodes, seed, train_kwargs):
+    """Trains copies of the broadcast players and returns the changes each made to its Q-table, with
+    a TrainingTelemetry counting the games."""
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    before_x, before_o = copy.deepcopy(ql_player_x.q_table), copy.deepcopy(ql_player_o.q_table)
+    telemetry = TrainingTelemetry(every=0)
+    train_q_learning_players(num_episodes, ql_player_x, ql_player_o, game_class, verbose=False,
+                             telemetry=telemetry, **train_kwargs)
+    return _table_deltas(before_x, ql_player_x.q_table), _table_deltas(before_o, ql_player_o.q_table), telemetry
+
+
+def _merge_deltas(player, worker_deltas, merge, row_shape):
+    """Applies the workers' changes to player's Q-table.
+
+    "sum" adds every worker's change, as if they had been made one after the other. "average" divides
+    each state's summed change by the number of workers that changed it.
+    """
+    totals, counts = {}, {}
+    for deltas in worker_deltas:
+        for state, delta in deltas.items():
+            if state in totals:
+                totals[state] += delta
+                counts[state] += 1
+            else:
+                totals[state], counts[state] = delta.copy(), 1
+    for state, total in totals.items():
+        if merge == "average":
+            total /= counts[state]
+        row = player.q_table.get(state)
+        if row is not None:
+            total += np.ravel(np.asarray(row, dtype=np.float64))
+        row = total.reshape(row_shape)
+        player.q_table[state] = row.tolist() if len(row_shape) == 1 else row  # Connect4 dict rows are lists
+
+
+def train_q_learning_parallel(num_episodes, ql_player_x, ql_player_o, game_class, num_workers=None,
+                              sync_episodes=1000, min_rounds=10, merge="average", seed=None, verbose=True,
+                              telemetry=None, **train_kwargs):
+    """Trains both Q-learning players with num_workers processes, merging their tables every round.
+
+    Each round the coordinator sends its current players to every worker, which trains them for
+    sync_episodes episodes with its own seed through train_q_learning_players (extra keyword arguments
+    are passed on) and sends back only the Q-values it changed. The coordinator merges the changes into
+    its tables, see _merge_deltas, and the next round starts from the merged tables. Rounds continue
+    until num_episodes episodes were played in total. sync_episodes is lowered when needed so that there
+    are at least min_rounds rounds: workers that never see each other's updates learn little more
+    than one of them alone. With telemetry, the workers' game counts are
+    added to it and a record is written after every round. Returns the trained players.
+    """
+    if merge not in ("sum", "average"):
+        raise ValueError(f"Unknown merge {merge!r}, expected 'sum' or 'average'")
+    num_workers = num_workers or os.cpu_count() or 1
+    row_shape = ROW_SHAPES[game_class.to_string()]
+    sync_episodes = max(1, min(sync_episodes, num_episodes // (num_workers * min_rounds)))
+    seeds = random.Random(seed)
+    played = rounds = 0
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        while played < num_episodes:
+            episodes = [min(sync_episodes, max(0, num_episodes - played - worker * sync_episodes))
+                        for worker in range(num_workers)]
+            futures = [executor.submit(_train_worker, ql_player_x, ql_player_o, game_class, count,
+                                       seeds.getrandbits(64), train_kwargs)
+                       for count in episodes if count]
+            results = [future.result() for future in futures]
+            _merge_deltas(ql_player_x, [deltas_x for deltas_x, _, _ in results], merge, row_shape)
+            _merge_deltas(ql_player_o, [deltas_o for _, deltas_o, _ in results], merge, row_shape)
+            if telemetry is not None:
+                for _, _, worker_telemetry in results:
+                    telemetry.add(worker_telemetry)
+                telemetry.emit(ql_player_x, ql_player_o)
+            played += sum(episodes)
+            rounds += 1
+            if verbose:
+                print(f"Round {rounds}: {played} of {num_episodes} episodes, "
+                      f"{len(ql_player_x.q_table)} and {len(ql_player_o.q_table)} states")
+    return ql_player_x, ql_player_o
@@ -1,14 +1,30 @@
 import numpy as np
+import os
 import random
 
+from game.connect4 import Connect4, mirror_position_key, place_position_key, position_key
+from game.ttt import (SYMMETRIES, INVERSE_SYMMETRIES, TicTacToe, canonical_board, canonical_code, place_state_code,
+                      state_code, symmetric_codes)
+from players.frozen_policy import FrozenPolicy, policy_path
+from players.qtable import DenseQTable, FrozenQTable, HashedQTable
+from players.replay import ReplayBuffer
+
 
 class TTTQLearningPlayer:
-    def __init__(self, symbol, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.3):
+    def __init__(self, symbol, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.3, dense_q_table=False,
+                 use_symmetry=False):
         self.symbol = symbol
         self.learning_rate = learning_rate  # Alpha
         self.discount_factor = discount_factor  # Gamma
         self.exploration_rate = exploration_rate  # Epsilon for epsilon-greedy strategy
-        self.q_table = {}  # Initialize Q-table as an empty dictionary
+        # Either a dict keyed by board tuples, or a DenseQTable indexed by base-3 state codes
+        self.dense_q_table = dense_q_table
+        self.q_table = DenseQTable(3 ** 9, (3, 3)) if dense_q_table else {}
+        # With use_symmetry, states are stored in their canonical orientation and actions are mapped to match
+        self.use_symmetry = use_symmetry
+        self.symmetry = 0  # Index into SYMMETRIES of the transform applied by the last get_state call
+        self.frozen = False  # Set by use_frozen_q_table; states are then looked up by their integer key
+        self.policy_path = None  # Set by load() when the checkpoint came with a saved FrozenPolicy
         self.last_action = None  # Store the last action taken
     
     @classmethod
@@ -17,55 +33,181 @@ class TTTQLearningPlayer:
 
     def get_state(self, game):
         """Returns the current state as a tuple, which is hashable and can be used as a key in the Q-table."""
-        return tuple([tuple(row) for row in game.board])
+        if self.dense_q_table:
+            if self.use_symmetry:
+                state, self.symmetry = canonical_code(game.code)
+                return state
+            return game.code  # Kept up to date by the game on every move
+        if self.use_symmetry:
+            state, self.symmetry = canonical_board(game.board)
+        else:
+            state = tuple([tuple(row) for row in game.board])
+        if self.frozen:
+            return state_code(state)
+        return state
+
+    def encode_state(self, state):
+        """Returns the integer key of a state returned by get_state."""
+        return state if isinstance(state, int) else state_code(state)
+
+    def freeze_q_table(self):
+        """Returns a read-only FrozenQTable copy of the Q-table, keyed by integer state keys."""
+        if self.frozen:
+            return self.q_table
+        return FrozenQTable.from_items(((self.encode_state(state), row) for state, row in self.q_table.items()
+                                        if state is not None), (3, 3))
+
+    def use_frozen_q_table(self, table):
+        """Switches to a FrozenQTable built by freeze_q_table, for playing without further training."""
+        self.q_table = table
+        self.frozen = True
+
+    def frozen_policy(self, exploration_rate=0.0):
+        """Returns a FrozenPolicy with the greedy moves of every board the Q-table covers.
+
+        With use_symmetry, each stored state is expanded to all of its symmetric boards, so the policy
+        never has to canonicalize. Players returned by load() open the policy saved with their checkpoint
+        instead.
+        """
+        if self.policy_path is not None:
+            return FrozenPolicy.load(self.policy_path, self.symbol, exploration_rate)
+        moves = {}
+        game = TicTacToe()
+        for state, _ in self.q_table.items():
+            if state is None:
+                continue
+            code = self.encode_state(state)
+            for image in set(symmetric_codes(code)) if self.use_symmetry else (code,):
+                game.reset()
+                place_state_code(game, image)
+                greedy = self.greedy_actions(self.get_state(game), self.legal_actions(game))
+                moves[game.hash] = sum(1 << 3 * row + col for row, col in map(self.board_action, greedy))
+        return FrozenPolicy.from_moves(self.symbol, "ttt", moves, exploration_rate)
+
+    def save(self, path):
+        """Writes the Q-table and hyperparameters to a binary checkpoint file, and the greedy FrozenPolicy
+        next to it."""
+        self.freeze_q_table().save(path, self.learning_rate, self.discount_factor, self.exploration_rate,
+                                   self.use_symmetry, self.dense_q_table)
+        self.frozen_policy().save(policy_path(path))
 
-    def update_q_table(self, state, action, next_state, reward, done):
-        """Update the Q-table using the Q-learning algorithm."""
-        if state not in self.q_table:
-            self.q_table[state] = np.zeros((3, 3))
-        if next_state not in self.q_table:
-            self.q_table[next_state] = np.zeros((3, 3))
-        
+    @classmethod
+    def load(cls, symbol, path):
+        """Returns a player for playing with a checkpoint written by save(), memory-mapped rather than read."""
+        table, metadata = FrozenQTable.load(path)
+        player = cls(symbol, metadata["learning_rate"], metadata["discount_factor"], metadata["exploration_rate"],
+                     use_symmetry=metadata["use_symmetry"])
+        player.dense_q_table = metadata["int_states"]  # States must be canonicalized the same way as when saved
+        player.use_frozen_q_table(table)
+        if os.path.exists(policy_path(path)):
+            player.policy_path = policy_path(path)
+        return player
+
+    def symmetry_reduction(self):
+        """Returns the Q-table entry count, the count the same states would need without symmetry, and their ratio."""
+        entries = len(self.q_table)
+        if not self.use_symmetry:
+            return {"entries": entries, "entries_without_symmetry": entries, "reduction": 1.0}
+        expanded = sum(len(set(symmetric_codes(self.encode_state(state)))) for state, _ in self.q_table.items())
+        return {"entries": entries, "entries_without_symmetry": expanded,
+                "reduction": expanded / entries if entries else 1.0}
+
+    def update_q_table(self, state, action, next_state, reward, done, next_actions=None):
+        """Update the Q-table using the Q-learning algorithm.
+
+        next_actions limits the maximum over next_state's Q-values to the moves that are legal there.
+        """
         if done:
             target = reward  # If the game has ended, the reward is the final outcome
         else:
-            target = reward + self.discount_factor * np.max(self.q_table[next_state])
-        
+            if next_actions is None:
+                next_actions = [(row, col) for row in range(3) for col in range(3)]
+            target = reward + self.discount_factor * self.max_q_value(next_state, next_actions)
+        self.learn(state, action, target)
+
+    def learn(self, state, action, target):
+        """Moves the Q-value of (state, action) a learning-rate step towards target."""
+        if state not in self.q_table:
+            self.q_table[state] = np.zeros((3, 3))
         self.q_table[state][action] = (1 - self.learning_rate) * self.q_table[state][action] + \
                                       self.learning_rate * target
 
+    def max_q_value(self, state, actions):
+        """Returns the best Q-value of actions in state, counting unseen states as all zeros."""
+        q_values = self.q_table.get(state)
+        if q_values is None or not actions:
+            return 0
+        return max(q_values[action] for action in actions)
+
+    def legal_actions(self, game):
+        """Returns the legal moves in the orientation of the state last returned by get_state."""
+        if self.use_symmetry:
+            perm = SYMMETRIES[self.symmetry]
+            return [divmod(perm[3 * row + col], 3) for row, col in game.available_moves()]
+        return list(game.available_moves())
+
+    def encode_action(self, action):
+        """Returns the cell index of an action, for storing it in a ReplayBuffer."""
+        return 3 * action[0] + action[1]
+
+    def decode_action(self, index):
+        return divmod(index, 3)
+
+    def board_action(self, action):
+        """Maps an action in the orientation of the state last returned by get_state back onto the board."""
+        if self.use_symmetry:
+            return divmod(INVERSE_SYMMETRIES[self.symmetry][3 * action[0] + action[1]], 3)
+        return action
+
+    def greedy_actions(self, state, actions):
+        """Returns the actions with the highest Q-value in state; all of them if the state is unseen."""
+        q_values = self.q_table.get(state)
+        if q_values is None:
+            return list(actions)
+        max_q_value = max(q_values[action] for action in actions)
+        return [action for action in actions if q_values[action] == max_q_value]
+
     def choose_action(self, state, available_actions):
+        if self.use_symmetry:
+            # Work in the orientation of the canonical state, then map the choice back onto the board
+            perm = SYMMETRIES[self.symmetry]
+            available_actions = [divmod(perm[3 * row + col], 3) for row, col in available_actions]
         if random.uniform(0, 1) < self.exploration_rate:
             action = random.choice(available_actions)
         else:
-            q_values = self.q_table.get(state, np.zeros((3, 3)))
-            max_q_value = np.max(q_values[available_actions])
-            actions_with_max_q_value = [action for action in available_actions if q_values[action] == max_q_value]
-            action = random.choice(actions_with_max_q_value)
-        self.last_action = action  # Store the last action
-        return action
+            action = random.choice(self.greedy_actions(state, available_actions))
+        self.last_action = action  # Store the last action, in the orientation of state
+        return self.board_action(action)
 
     def input(self, game):
         """Determine the best move using the current Q-table."""
         if game.beginning:
             game.beginning = False
         state = self.get_state(game)
-        available_actions = [(row, col) for row in range(3) for col in range(3) if game.board[row][col] == " "]
+        available_actions = game.available_moves()
         action = self.choose_action(state, available_actions)
         return action
 
     def get_last_action(self):
-        """Returns the last action taken by this player."""
+        """Returns the last action taken by this player, in the orientation of the state it was chosen in."""
         return self.last_action
 
 
 class Connect4QLearningPlayer:
-    def __init__(self, symbol, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.3):
+    def __init__(self, symbol, learning_rate=0.1, discount_factor=0.9, exploration_rate=0.3, q_table_capacity=None,
+                 use_symmetry=False):
         self.symbol = symbol
         self.learning_rate = learning_rate  # Alpha
         self.discount_factor = discount_factor  # Gamma
         self.exploration_rate = exploration_rate  # Epsilon for epsilon-greedy strategy
-        self.q_table = {}  # Initialize Q-table as an empty dictionary
+        # Either an unbounded dict keyed by board tuples, or a HashedQTable of fixed capacity keyed by position keys
+        self.position_keys = bool(q_table_capacity)
+        self.q_table = HashedQTable(q_table_capacity, 7) if q_table_capacity else {}
+        # With use_symmetry, a position and its mirror image share one entry and actions are mirrored to match
+        self.use_symmetry = use_symmetry
+        self.mirrored = False  # Whether the last get_state call returned the mirror image of the board
+        self.frozen = False  # Set by use_frozen_q_table; states are then looked up by their integer key
+        self.policy_path = None  # Set by load() when the checkpoint came with a saved FrozenPolicy
         self.last_action = None  # Store the last action taken
     
     @classmethod
@@ -74,45 +216,169 @@ class Connect4QLearningPlayer:
 
     def get_state(self, game):
         """Returns the current state as a tuple, which is hashable and can be used as a key in the Q-table."""
-        return tuple([tuple(row) for row in game.board])
+        if self.position_keys:
+            state = game.position_key()
+            if self.use_symmetry:
+                mirror = mirror_position_key(state)
+                self.mirrored = mirror < state
+                return min(state, mirror)
+            return state
+        state = tuple([tuple(row) for row in game.board])
+        if self.use_symmetry:
+            mirror = tuple([row[::-1] for row in state])
+            self.mirrored = mirror < state
+            state = min(state, mirror)
+        if self.frozen:
+            return position_key(state)
+        return state
+
+    def encode_state(self, state):
+        """Returns the integer key of a state returned by get_state."""
+        return state if isinstance(state, int) else position_key(state)
+
+    def freeze_q_table(self):
+        """Returns a read-only FrozenQTable copy of the Q-table, keyed by integer state keys."""
+        if self.frozen:
+            return self.q_table
+        return FrozenQTable.from_items(((self.encode_state(state), row) for state, row in self.q_table.items()
+                                        if state is not None), (7,))
+
+    def use_frozen_q_table(self, table):
+        """Switches to a FrozenQTable built by freeze_q_table, for playing without further training."""
+        self.q_table = table
+        self.frozen = True
+
+    def frozen_policy(self, exploration_rate=0.0):
+        """Returns a FrozenPolicy with the greedy columns of every position the Q-table covers.
+
+        With use_symmetry, each stored state is expanded to both mirror images, so the policy never has
+        to canonicalize. Players returned by load() open the policy saved with their checkpoint instead.
+        """
+        if self.policy_path is not None:
+            return FrozenPolicy.load(self.policy_path, self.symbol, exploration_rate)
+        moves = {}
+        game = Connect4()
+        for state, _ in self.q_table.items():
+            if state is None:
+                continue
+            key = self.encode_state(state)
+            for image in {key, mirror_position_key(key)} if self.use_symmetry else (key,):
+                game.reset()
+                place_position_key(game, image)
+                greedy = self.greedy_actions(self.get_state(game), self.legal_actions(game))
+                moves[game.hash] = sum(1 << self.board_action(action) for action in greedy)
+        return FrozenPolicy.from_moves(self.symbol, "connect4", moves, exploration_rate)
+
+    def save(self, path):
+        """Writes the Q-table and hyperparameters to a binary checkpoint file, and the greedy FrozenPolicy
+        next to it."""
+        self.freeze_q_table().save(path, self.learning_rate, self.discount_factor, self.exploration_rate,
+                                   self.use_symmetry, self.position_keys)
+        self.frozen_policy().save(policy_path(path))
 
-    def update_q_table(self, state, action, next_state, reward, done):
-        """Update the Q-table using the Q-learning algorithm."""
-        if state not in self.q_table:
-            self.q_table[state] = [0] * 7  # Initialize Q-values for each column
-        if next_state not in self.q_table:
-            self.q_table[next_state] = [0] * 7  # Initialize Q-values for each column
-        
+    @classmethod
+    def load(cls, symbol, path):
+        """Returns a player for playing with a checkpoint written by save(), memory-mapped rather than read."""
+        table, metadata = FrozenQTable.load(path)
+        player = cls(symbol, metadata["learning_rate"], metadata["discount_factor"], metadata["exploration_rate"],
+                     use_symmetry=metadata["use_symmetry"])
+        player.position_keys = metadata["int_states"]  # States must be canonicalized the same way as when saved
+        player.use_frozen_q_table(table)
+        if os.path.exists(policy_path(path)):
+            player.policy_path = policy_path(path)
+        return player
+
+    def symmetry_reduction(self):
+        """Returns the Q-table entry count, the count the same states would need without symmetry, and their ratio."""
+        if not self.use_symmetry:
+            entries = len(self.q_table)
+            return {"entries": entries, "entries_without_symmetry": entries, "reduction": 1.0}
+        entries = expanded = 0
+        for state, _ in self.q_table.items():
+            entries += 1
+            if isinstance(state, int):  # Position keys, also used by tables loaded from a checkpoint
+                expanded += 1 if mirror_position_key(state) == state else 2
+            else:
+                expanded += 1 if all(row == row[::-1] for row in state) else 2
+        return {"entries": entries, "entries_without_symmetry": expanded,
+                "reduction": expanded / entries if entries else 1.0}
+
+    def update_q_table(self, state, action, next_state, reward, done, next_actions=None):
+        """Update the Q-table using the Q-learning algorithm.
+
+        next_actions limits the maximum over next_state's Q-values to the columns that are legal there.
+        """
         if done:
             target = reward  # If the game has ended, the reward is the final outcome
         else:
-            target = reward + self.discount_factor * max(self.q_table[next_state])
-        
+            if next_actions is None:
+                next_actions = range(7)
+            # Reading before inserting state means a bounded table cannot evict the row about to be updated
+            target = reward + self.discount_factor * self.max_q_value(next_state, next_actions)
+        self.learn(state, action, target)
+
+    def learn(self, state, action, target):
+        """Moves the Q-value of (state, action) a learning-rate step towards target."""
+        if state not in self.q_table:
+            self.q_table[state] = [0] * 7  # Initialize Q-values for each column
         self.q_table[state][action] = (1 - self.learning_rate) * self.q_table[state][action] + \
                                       self.learning_rate * target
 
+    def max_q_value(self, state, actions):
+        """Returns the best Q-value of actions in state, counting unseen states as all zeros."""
+        q_values = self.q_table.get(state)
+        if q_values is None or not actions:
+            return 0
+        return max(q_values[action] for action in actions)
+
+    def legal_actions(self, game):
+        """Returns the legal columns in the orientation of the state last returned by get_state."""
+        if self.use_symmetry and self.mirrored:
+            return [6 - col for col in game.get_possible_columns()]
+        return game.get_possible_columns()
+
+    def encode_action(self, action):
+        """Returns the column of an action, for storing it in a ReplayBuffer."""
+        return action
+
+    def decode_action(self, index):
+        return index
+
+    def board_action(self, action):
+        """Maps a column in the orientation of the state last returned by get_state back onto the board."""
+        if self.use_symmetry and self.mirrored:
+            return 6 - action
+        return action
+
+    def greedy_actions(self, state, actions):
+        """Returns the columns with the highest Q-value in state; all of them if the state is unseen."""
+        q_values = self.q_table.get(state)
+        if q_values is None:
+            return list(actions)
+        max_q_value = max(q_values[action] for action in actions)
+        return [action for action in actions if q_values[action] == max_q_value]
+
     def choose_action(self, state, available_actions):
+        if self.use_symmetry and self.mirrored:
+            available_actions = [6 - col for col in available_actions]
         if random.uniform(0, 1) < self.exploration_rate:
             action = random.choice(available_actions)
         else:
-            q_values = self.q_table.get(state, [0] * 7)  # Initialize Q-values for each column
-            max_q_value = max(q_values)
-            actions_with_max_q_value = [action for action in available_actions if q_values[action] == max_q_value]
-            action = random.choice(actions_with_max_q_value)
-        self.last_action = action  # Store the last action
-        return action
+            action = random.choice(self.greedy_actions(state, available_actions))
+        self.last_action = action  # Store the last action, in the orientation of state
+        return self.board_action(action)
 
     def input(self, game):
         """Determine the best move using the current Q-table."""
         if game.beginning:
             game.beginning = False
         state = self.get_state(game)
-        available_actions = [col for col in range(7) if game.is_valid_move(col)]  # Adjust for Connect4
+        available_actions = game.get_possible_columns()
         action = self.choose_action(state, available_actions)
         return action
 
     def get_last_action(self):
-        """Returns the last action taken by this player."""
+        """Returns the last action taken by this player, in the orientation of the state it was chosen in."""
         return self.last_action
 
 
@@ -130,7 +396,7 @@ class TTTRandomPlayer:
     def input(self, game):
         if game.beginning:
             game.beginning = False
-        available_actions = [(row, col) for row in range(3) for col in range(3) if game.board[row][col] == " "]
+        available_actions = game.available_moves()
         action = random.choice(available_actions)
         self.last_action = action
         return action
@@ -153,7 +419,7 @@ class Connect4RandomPlayer:
     def input(self, game):
         if game.beginning:
             game.beginning = False
-        available_actions = [col for col in range(7) if game.is_valid_move(col)]  # Adjust for Connect4
+        available_actions = game.get_possible_columns()
         action = random.choice(available_actions)
         self.last_action = action
         return action
@@ -163,107 +429,99 @@ class Connect4RandomPlayer:
         return self.last_action
 
 
-def train_q_learning_players(num_episodes, ql_player_x, ql_player_o, game_class):
-    print("Training Q-learning players X and O with Random player.")
+def train_q_learning_players(num_episodes, ql_player_x, ql_player_o, game_class, verbose=True, n_step=1,
+                             replay_capacity=0, replay_batch_size=32, telemetry=None):
+    """Trains ql_player_x in even episodes and ql_player_o in odd ones, each against a random player.
+
+    Every move of the learning player is a transition, and its Q-value is moved towards the n_step
+    return: the discounted reward of the following n_step moves of that player plus the discounted best
+    Q-value of the state it then faces. With replay_capacity, finished transitions are also kept in a
+    ReplayBuffer per player, and replay_batch_size of them are replayed after every episode. This needs
+    integer states, i.e. dense_q_table for Tic Tac Toe or q_table_capacity for Connect4. A
+    TrainingTelemetry passed as telemetry is told the learner's result and length of every game.
+    """
+    if verbose:
+        print("Training Q-learning players X and O with Random player.")
     win_count = {"X": 0, "O": 0, "Draw": 0}
+    game = game_class()
+    ttt = game_class.to_string() == "ttt"
+    if ttt:
+        random_player_x, random_player_o = TTTRandomPlayer("X"), TTTRandomPlayer("O")
+    else:
+        random_player_x, random_player_o = Connect4RandomPlayer("X"), Connect4RandomPlayer("O")
+    buffers = {}
+    if replay_capacity:
+        buffers = {player.symbol: ReplayBuffer(replay_capacity) for player in (ql_player_x, ql_player_o)}
 
     for episode in range(num_episodes):
-        game = game_class()
-
-        if game_class.to_string() == "ttt":
-            random_player_x = TTTRandomPlayer("X")
-            random_player_o = TTTRandomPlayer("O")
-        else:
-            random_player_x = Connect4RandomPlayer("X")
-            random_player_o = Connect4RandomPlayer("O")
-        
+        game.reset()
         # Alternate starting player each episode
         if episode % 2 == 0:
-            player_x, player_o = ql_player_x, random_player_o
+            learner, players = ql_player_x, {"X": ql_player_x, "O": random_player_o}
         else:
-            player_x, player_o = random_player_x, ql_player_o
-            
-        current_player = player_x  # X starts the game
+            learner, players = ql_player_o, {"X": random_player_x, "O": ql_player_o}
+        buffer = buffers.get(learner.symbol)
+        pending = []  # (state, action) of the learner's moves whose n-step return is not known yet
 
         while True:
-            if game_class.to_string() == "ttt":
-                row, col = current_player.input(game)
-                game_over, winner = game.user_input(row, col)
+            if players[game.current_player] is learner:
+                state = learner.get_state(game)
+                if len(pending) == n_step:
+                    # Rewards only come at the end of the game, so the return is the discounted value of state
+                    actions = learner.legal_actions(game)
+                    _learn_transition(learner, buffer, *pending.pop(0), 0, learner.discount_factor ** n_step,
+                                      state, actions)
+                action = learner.choose_action(state, game.available_moves() if ttt else game.get_possible_columns())
+                pending.append((state, learner.last_action))
             else:
-                col = current_player.input(game)
-                game_over, winner = game.user_input(col)
+                action = players[game.current_player].input(game)
 
+            if ttt:
+                game_over, winner = game.user_input(*action)
+            else:
+                game_over, winner = game.user_input(action)
             if game_over:
-                if winner == "X":
-                    win_count["X"] += 1
-                    reward_x = 1
-                    reward_o = -1
-                elif winner == "O":
-                    win_count["O"] += 1
-                    reward_x = -1
-                    reward_o = 1
-                else:  # Draw
-                    win_count["Draw"] += 1
-                    reward_x = reward_o = 0.5
-
-                # Update Q-table for both players at the end of the game
-                next_state_x = next_state_o = None  # No next state since the game is over
-                action_x = player_x.get_last_action()
-                action_o = player_o.get_last_action()
-                state_x = player_x.get_state(game)
-                state_o = player_o.get_state(game)
-                ql_player_x.update_q_table(state_x, action_x, next_state_x, reward_x, True)
-                ql_player_o.update_q_table(state_o, action_o, next_state_o, reward_o, True)
                 break
 
-            # Switch players
-            current_player = player_x if current_player == player_o else player_o
-
-    print(f"Training complete. Win counts: {win_count}")
+        win_count[winner or "Draw"] += 1
+        if winner is None:
+            reward = 0.5
+        else:
+            reward = 1 if winner == learner.symbol else -1
+        if telemetry is not None:
+            outcome = "draw" if winner is None else "win" if reward == 1 else "loss"
+            telemetry.episode(outcome, game.move_count, ql_player_x, ql_player_o)
+        for steps_left, (state, action) in enumerate(reversed(pending)):
+            _learn_transition(learner, buffer, state, action, reward * learner.discount_factor ** steps_left, 0,
+                              None, ())
+        if buffer is not None and len(buffer) >= replay_batch_size:
+            for transition in buffer.sample(replay_batch_size).tolist():
+                _replay_transition(learner, *transition)
+
+    if verbose:
+        print(f"Training complete. Win counts: {win_count}")
     return ql_player_x, ql_player_o
 
 
-def evaluate_players(player_x, player_o, game_class, num_games=100):
-    win_count = {"X": 0, "O": 0, "Draw": 0}
-    
-    for _ in range(num_games):
-        game = game_class()
-        current_player = player_x
-        
-        while True:
-            row, col = current_player.input(game)
-            game_over, winner = game.user_input(row, col)
-
-            if game_over:
-                if winner == "X":
-                    win_count["X"] += 1
-                elif winner == "O":
-                    win_count["O"] += 1
-                else:
-                    win_count["Draw"] += 1
-                break
-
-            current_player = player_x if current_player == player_o else player_o
-    
-    return win_count
-
-
-def tune_parameters(game_class, num_episodes, param_grid):
-    best_params = {}
-    best_avg_win_rate = -1
-    
-    for learning_rate in param_grid['learning_rate']:
-        for discount_factor in param_grid['discount_factor']:
-            for exploration_rate in param_grid['exploration_rate']:
-                ql_player_x = TTTQLearningPlayer("X", learning_rate, discount_factor, exploration_rate)
-                ql_player_o = TTTQLearningPlayer("O", learning_rate, discount_factor, exploration_rate)
-                
-                ql_player_x, ql_player_o = train_q_learning_players(num_episodes, ql_player_x, ql_player_o, game_class)
-                
-                avg_win_rate = (evaluate_players(ql_player_x, ql_player_o, game_class)['X'] + evaluate_players(ql_player_x, ql_player_o, game_class)['O']) / (2 * num_episodes)
-                
-                if avg_win_rate > best_avg_win_rate:
-                    best_avg_win_rate = avg_win_rate
-                    best_params = {'learning_rate': learning_rate, 'discount_factor': discount_factor, 'exploration_rate': exploration_rate}
-    
-    return best_params, best_avg_win_rate
\ No newline at end of file
+def _learn_transition(learner, buffer, state, action, reward, discount, next_state, next_actions):
+    """Moves Q(state, action) towards reward + discount * max Q(next_state, a) and stores the transition."""
+    target = reward
+    if discount:
+        target += discount * learner.max_q_value(next_state, next_actions)
+    learner.learn(state, action, target)
+    if buffer is not None:
+        if not isinstance(state, int):
+            raise ValueError("Experience replay needs integer states: use dense_q_table or q_table_capacity")
+        next_mask = 0
+        for next_action in next_actions:
+            next_mask |= 1 << learner.encode_action(next_action)
+        buffer.add(state, learner.encode_action(action), reward, discount, next_state or 0, next_mask)
+
+
+def _replay_transition(learner, state, action, reward, discount, next_state, next_mask):
+    """Repeats the update of a transition stored by _learn_transition against the current Q-table."""
+    target = reward
+    if discount:
+        next_actions = [learner.decode_action(index) for index in range(next_mask.bit_length()) if next_mask >> index & 1]
+        target += discount * learner.max_q_value(next_state, next_actions)
+    learner.learn(state, learner.decode_action(action), target)
@@ -0,0 +1,288 @@
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# Checkpoint header: magic, version, entry count, row shape (second dimension 0 for 1-D rows),
+# learning rate, discount factor, exploration rate, symmetry flag, integer-state flag; padded to 64 bytes
+CHECKPOINT_MAGIC = b"QTAB"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_HEADER = struct.Struct("<4sIQII3d??")
+CHECKPOINT_HEADER_SIZE = 64
+
+
+class DenseQTable:
+    """Q-values for every state of a game with small integer state codes, in one preallocated array.
+
+    Behaves like the dict Q-tables: `state in table` is True once a row was assigned, and rows come back
+    as writable views shaped row_shape, so player code can index them the same way.
+    """
+    def __init__(self, num_states, row_shape):
+        self.row_shape = row_shape
+        self.values = np.zeros((num_states, int(np.prod(row_shape))), dtype=np.float32)
+        self.visited = np.zeros(num_states, dtype=bool)
+
+    def __contains__(self, state):
+        return state is not None and bool(self.visited[state])
+
+    def __getitem__(self, state):
+        return self.values[state].reshape(self.row_shape)
+
+    def __setitem__(self, state, row):
+        self.values[state] = np.ravel(row)
+        self.visited[state] = True
+
+    def __len__(self):
+        return int(self.visited.sum())
+
+    def get(self, state, default=None):
+        return self[state] if state in self else default
+
+    def items(self):
+        for state in np.flatnonzero(self.visited):
+            yield int(state), self[state]
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.visited.nbytes
+
+    def save(self, path):
+        """Writes the value array to a .npy file."""
+        np.save(path, self.values)
+
+    @classmethod
+    def load(cls, path, row_shape):
+        """Reads a table written by save(). Rows with any non-zero value count as visited."""
+        values = np.load(path)
+        table = cls(len(values), row_shape)
+        table.values[:] = values
+        table.visited[:] = values.any(axis=1)
+        return table
+
+
+class HashedQTable:
+    """Memory-bounded Q-table keyed by 64-bit position keys, stored in preallocated arrays.
+
+    Open addressing: a key probes probe_length consecutive slots starting at its hashed index and uses
+    the first slot holding it or the first free one. When every slot in the window is taken, the entry
+    with the fewest visits ("visits") or the least recent visit ("lru") is evicted. Slots never become
+    free again, so a lookup can stop at the first free slot. Rows are writable float32 views.
+    """
+    def __init__(self, capacity, num_actions, probe_length=8, eviction="visits"):
+        if eviction not in ("visits", "lru"):
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+        self.capacity = capacity
+        self.probe_length = min(probe_length, capacity)
+        self.eviction = eviction
+        self.keys = np.zeros(capacity, dtype=np.uint64)
+        self.used = np.zeros(capacity, dtype=bool)
+        self.values = np.zeros((capacity, num_actions), dtype=np.float32)
+        self.visits = np.zeros(capacity, dtype=np.uint32)
+        self.last_visit = np.zeros(capacity, dtype=np.uint64)
+        self.clock = 0
+        self.count = 0
+        self.evictions = 0
+
+    def _index(self, key):
+        # The splitmix64 finalizer mixes every key bit into every bit, so the structured position keys
+        # spread evenly over any capacity
+        key = int(key)
+        key = ((key ^ key >> 30) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        key = ((key ^ key >> 27) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        return (key ^ key >> 31) % self.capacity
+
+    def _find(self, key):
+        index = self._index(key)
+        for step in range(self.probe_length):
+            slot = (index + step) % self.capacity
+            if not self.used[slot]:
+                return -1
+            if self.keys[slot] == key:
+                return slot
+        return -1
+
+    def _insert(self, key):
+        index = self._index(key)
+        window = [(index + step) % self.capacity for step in range(self.probe_length)]
+        for slot in window:
+            if not self.used[slot]:
+                self.used[slot] = True
+                self.count += 1
+                break
+        else:
+            ranking = self.visits if self.eviction == "visits" else self.last_visit
+            slot = min(window, key=lambda slot: ranking[slot])
+            self.evictions += 1
+        self.keys[slot] = key
+        self.values[slot] = 0
+        self.visits[slot] = 0
+        return slot
+
+    def _touch(self, slot):
+        self.clock += 1
+        self.visits[slot] += 1
+        self.last_visit[slot] = self.clock
+
+    def __contains__(self, key):
+        return key is not None and self._find(key) >= 0
+
+    def __getitem__(self, key):
+        slot = self._find(key)
+        if slot < 0:
+            raise KeyError(key)
+        self._touch(slot)
+        return self.values[slot]
+
+    def __setitem__(self, key, row):
+        slot = self._find(key)
+        if slot < 0:
+            slot = self._insert(key)
+        self.values[slot] = row
+        self._touch(slot)
+
+    def __len__(self):
+        return self.count
+
+    def get(self, key, default=None):
+        slot = self._find(key) if key is not None else -1
+        if slot < 0:
+            return default
+        self._touch(slot)
+        return self.values[slot]
+
+    def items(self):
+        for slot in np.flatnonzero(self.used):
+            yield int(self.keys[slot]), self.values[slot]
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.used.nbytes + self.values.nbytes + self.visits.nbytes + self.last_visit.nbytes
+
+
+class FrozenQTable:
+    """Read-only Q-table laid out as a sorted uint64 key array and a float32 value matrix.
+
+    Lookups are binary searches, so the arrays can live in shared memory or a memory-mapped file and be
+    used in place by any number of processes. Rows come back as read-only views shaped row_shape.
+    """
+    def __init__(self, keys, values, row_shape):
+        self.keys = keys
+        self.values = values
+        self.row_shape = row_shape
+        self.keys.flags.writeable = False
+        self.values.flags.writeable = False
+
+    @classmethod
+    def from_items(cls, items, row_shape):
+        """Builds a table from (int key, row) pairs."""
+        items = sorted(items, key=lambda item: item[0])
+        keys = np.array([key for key, _ in items], dtype=np.uint64)
+        values = np.zeros((len(items), int(np.prod(row_shape))), dtype=np.float32)
+        for index, (_, row) in enumerate(items):
+            values[index] = np.ravel(row)
+        return cls(keys, values, row_shape)
+
+    def _find(self, key):
+        if key is None:
+            return -1
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index < len(self.keys) and self.keys[index] == key:
+            return index
+        return -1
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def __getitem__(self, key):
+        index = self._find(key)
+        if index < 0:
+            raise KeyError(key)
+        return self.values[index].reshape(self.row_shape)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get(self, key, default=None):
+        index = self._find(key)
+        if index < 0:
+            return default
+        return self.values[index].reshape(self.row_shape)
+
+    def items(self):
+        for index in range(len(self.keys)):
+            yield int(self.keys[index]), self.values[index].reshape(self.row_shape)
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.values.nbytes
+
+    def save(self, path, learning_rate, discount_factor, exploration_rate, use_symmetry, int_states):
+        """Writes the table as a checkpoint: a 64-byte header, the sorted keys, then the value matrix."""
+        rows, cols = (tuple(self.row_shape) + (0,))[:2]
+        header = CHECKPOINT_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, len(self.keys), rows, cols,
+                                        learning_rate, discount_factor, exploration_rate, use_symmetry, int_states)
+        with open(path, "wb") as checkpoint:
+            checkpoint.write(header.ljust(CHECKPOINT_HEADER_SIZE, b"\0"))
+            checkpoint.write(np.ascontiguousarray(self.keys, dtype=np.uint64).tobytes())
+            checkpoint.write(np.ascontiguousarray(self.values, dtype=np.float32).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps a checkpoint written by save(); entries are only read from disk when looked up.
+
+        Returns the table and a dict with the hyperparameters and flags stored in the header.
+        """
+        with open(path, "rb") as checkpoint:
+            header = checkpoint.read(CHECKPOINT_HEADER_SIZE)
+        (magic, version, count, rows, cols, learning_rate, discount_factor, exploration_rate, use_symmetry,
+         int_states) = CHECKPOINT_HEADER.unpack_from(header)
+        if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+            raise ValueError(f"{path} is not a version {CHECKPOINT_VERSION} Q-table checkpoint.")
+        row_shape = (rows, cols) if cols else (rows,)
+        row_size = rows * max(cols, 1)
+        keys = np.memmap(path, dtype=np.uint64, mode="r", offset=CHECKPOINT_HEADER_SIZE, shape=(count,)) \
+            if count else np.zeros(0, dtype=np.uint64)
+        values = np.memmap(path, dtype=np.float32, mode="r", offset=CHECKPOINT_HEADER_SIZE + keys.nbytes,
+                           shape=(count, row_size)) if count else np.zeros((0, row_size), dtype=np.float32)
+        metadata = {"learning_rate": learning_rate, "discount_factor": discount_factor,
+                    "exploration_rate": exploration_rate, "use_symmetry": use_symmetry, "int_states": int_states}
+        return cls(keys, values, row_shape), metadata
+
+
+def share_arrays(arrays):
+    """Copies arrays into one new shared memory block, each starting on an 8-byte boundary.
+
+    Returns the block, read-only views of the copies and a picklable handle for attach_arrays().
+    The caller must close() and unlink() the block once no process needs it any more.
+    """
+    offsets, size = [], 0
+    for array in arrays:
+        offsets.append(size)
+        size += -(-array.nbytes // 8) * 8
+    block = shared_memory.SharedMemory(create=True, size=max(1, size))
+    handle = (block.name, tuple((array.dtype.str, array.shape, offset) for array, offset in zip(arrays, offsets)))
+    views = _array_views(block, handle)
+    for view, array in zip(views, arrays):
+        view.flags.writeable = True
+        view[...] = array
+        view.flags.writeable = False
+    return block, views, handle
+
+
+def attach_arrays(handle):
+    """Opens arrays shared by share_arrays() in another process, without copying them.
+
+    Returns the block, which must stay referenced while the views are used, and the read-only views.
+    """
+    block = shared_memory.SharedMemory(name=handle[0])
+    return block, _array_views(block, handle)
+
+
+def _array_views(block, handle):
+    views = []
+    for dtype, shape, offset in handle[1]:
+        view = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+        view.flags.writeable = False
+        views.append(view)
+    return views
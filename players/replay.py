@@ -0,0 +1,28 @@
+import numpy as np
+
+# One transition: the Q-value of (state, action) is moved towards reward + discount * max Q(next_state, a)
+# over the actions set in the next_actions bitmask. Final transitions have discount 0.
+TRANSITION_DTYPE = np.dtype([("state", "<u8"), ("action", "u1"), ("reward", "<f4"), ("discount", "<f4"),
+                             ("next_state", "<u8"), ("next_actions", "<u2")])
+
+
+class ReplayBuffer:
+    """Preallocated ring buffer of transitions between integer states; the oldest are overwritten when full."""
+    def __init__(self, capacity, rng=None):
+        self.transitions = np.zeros(capacity, dtype=TRANSITION_DTYPE)
+        self.capacity = capacity
+        self.size = 0
+        self.position = 0  # Where the next transition goes
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, discount, next_state, next_actions):
+        self.transitions[self.position] = (state, action, reward, discount, next_state, next_actions)
+        self.position = (self.position + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size):
+        """Returns batch_size transitions drawn uniformly with replacement, as a structured array."""
+        return self.transitions[self.rng.integers(0, self.size, batch_size)]
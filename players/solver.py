@@ -0,0 +1,135 @@
+import os
+import random
+
+import numpy as np
+
+from game.ttt import TicTacToe, WINNING, FULL_MASK, POWERS_OF_3, INVERSE_SYMMETRIES, canonical_code, state_code
+
+
+class TTTSolution:
+    """Perfect-play table for Tic Tac Toe, reduced by the 8 board symmetries.
+
+    For every reachable position whose code is the smallest among its symmetric images, the table stores
+    the game value for the side to move (1 win, 0 draw, -1 loss) and a 9-bit mask of the cells that
+    achieve it. Entries are packed as (value + 1) | move_mask << 2.
+    """
+    def __init__(self, codes, entries):
+        self.codes = np.asarray(codes, dtype=np.uint16)
+        self.entries = np.asarray(entries, dtype=np.uint16)
+        self.table = dict(zip(self.codes.tolist(), self.entries.tolist()))
+
+    def __len__(self):
+        return len(self.table)
+
+    @classmethod
+    def build(cls):
+        """Solves every position reachable from the empty board."""
+        positions = {}  # code -> packed entry, for every reachable position
+
+        def solve(x_mask, o_mask, code, to_move_digit):
+            if code in positions:
+                return positions[code] % 4 - 1
+            occupied = x_mask | o_mask
+            if WINNING[x_mask] or WINNING[o_mask]:
+                value, move_mask = -1, 0  # The previous move won
+            elif occupied == FULL_MASK:
+                value, move_mask = 0, 0
+            else:
+                value, move_mask = -2, 0
+                for cell in range(9):
+                    bit = 1 << cell
+                    if occupied & bit:
+                        continue
+                    child_code = code + to_move_digit * POWERS_OF_3[cell]
+                    if to_move_digit == 1:
+                        score = -solve(x_mask | bit, o_mask, child_code, 2)
+                    else:
+                        score = -solve(x_mask, o_mask | bit, child_code, 1)
+                    if score > value:
+                        value, move_mask = score, bit
+                    elif score == value:
+                        move_mask |= bit
+            positions[code] = (value + 1) | move_mask << 2
+            return value
+
+        solve(0, 0, 0, 1)
+        canonical = sorted(code for code in positions if canonical_code(code)[0] == code)
+        return cls(canonical, [positions[code] for code in canonical])
+
+    def save(self, path):
+        """Writes the table to an .npz file."""
+        np.savez(path, codes=self.codes, entries=self.entries)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a table written by save()."""
+        with np.load(path) as data:
+            return cls(data["codes"], data["entries"])
+
+    def lookup(self, board):
+        """Returns the value for the side to move and the list of optimal (row, col) moves."""
+        code, symmetry = canonical_code(state_code(board))
+        entry = self.table[code]
+        inverse = INVERSE_SYMMETRIES[symmetry]
+        moves = [divmod(inverse[cell], 3) for cell in range(9) if entry >> (cell + 2) & 1]
+        return entry % 4 - 1, moves
+
+
+_SOLUTION = None
+
+
+def load_solution(cache_path=None):
+    """Returns the shared TTTSolution, reading it from cache_path if it exists and writing it there otherwise."""
+    global _SOLUTION
+    if _SOLUTION is None:
+        if cache_path is not None and os.path.exists(cache_path):
+            _SOLUTION = TTTSolution.load(cache_path)
+        else:
+            _SOLUTION = TTTSolution.build()
+            if cache_path is not None:
+                _SOLUTION.save(cache_path)
+    return _SOLUTION
+
+
+class TTTSolvedPlayer:
+    """Plays perfectly by looking each position up in the precomputed TTTSolution."""
+    def __init__(self, symbol, solution=None):
+        self.symbol = symbol
+        self.solution = solution if solution is not None else load_solution()
+
+    def input(self, game):
+        """Pick a random move among the optimal ones."""
+        if game.beginning:
+            game.beginning = False
+        _, moves = self.solution.lookup(game.board)
+        return random.choice(moves)
+
+    @classmethod
+    def to_string(cls) -> str:
+        return "solved"
+
+
+def optimal_move_rate(player, solution=None):
+    """Returns the fraction of positions, with player.symbol to move, where the player picks an optimal move.
+
+    Only positions that the solver reached and that are not over are scored. Turn off any exploration in
+    the player before calling this.
+    """
+    solution = solution if solution is not None else load_solution()
+    digit = 1 if player.symbol == "X" else 2
+    scored = optimal = 0
+    for code, entry in solution.table.items():
+        digits = [code // POWERS_OF_3[cell] % 3 for cell in range(9)]
+        x_count, o_count = digits.count(1), digits.count(2)
+        if entry >> 2 == 0 or (1 if x_count == o_count else 2) != digit:
+            continue
+        game = TicTacToe()
+        for cell in range(9):
+            if digits[cell]:
+                game.place(cell // 3, cell % 3, " XO"[digits[cell]])
+        game.current_player = player.symbol
+        game.beginning = x_count + o_count == 0
+        row, col = player.input(game)
+        scored += 1
+        optimal += entry >> (3 * row + col + 2) & 1
+    return optimal / scored if scored else 0.0
@@ -0,0 +1,51 @@
+import time
+
+
+class SearchStats:
+    """Optional counters for the minimax players, passed to them as stats=SearchStats().
+
+    The player calls start_move() and end_move() around each search and bumps the counters in between.
+    Finished moves are kept in moves; summary() totals them for a game and merge() combines summaries,
+    for example over all games of a tournament pairing.
+    """
+    def __init__(self):
+        self.moves = []
+        self.start_move()
+
+    def start_move(self):
+        """Resets the per-move counters and starts the move timer."""
+        self.nodes = 0
+        self.leaves = 0  # Terminal positions and depth-limit evaluations
+        self.cutoffs = {}  # Beta cutoffs by the index of the move that caused them, 0 being the first tried
+        self.tt_hits = 0
+        self.max_depth = 0
+        self.start = time.perf_counter()
+
+    def cutoff(self, move_index):
+        self.cutoffs[move_index] = self.cutoffs.get(move_index, 0) + 1
+
+    def end_move(self):
+        """Records the counters of the move that just finished."""
+        self.moves.append({"nodes": self.nodes, "leaves": self.leaves, "cutoffs": self.cutoffs,
+                           "tt_hits": self.tt_hits, "max_depth": self.max_depth,
+                           "wall_ms": (time.perf_counter() - self.start) * 1000})
+
+    def summary(self, games=1):
+        """Returns the totals over all recorded moves, which were made in the given number of games."""
+        return merge([{"moves": 1, **move, "max_wall_ms": move["wall_ms"]} for move in self.moves]
+                     + [{"games": games}])
+
+
+def merge(summaries):
+    """Combines summaries into one: counts are added, maxima kept and the mean wall time recomputed."""
+    total = {"games": 0, "moves": 0, "nodes": 0, "leaves": 0, "cutoffs": {}, "tt_hits": 0, "max_depth": 0,
+             "wall_ms": 0.0, "max_wall_ms": 0.0}
+    for summary in summaries:
+        for name in ("games", "moves", "nodes", "leaves", "tt_hits", "wall_ms"):
+            total[name] += summary.get(name, 0)
+        total["max_depth"] = max(total["max_depth"], summary.get("max_depth", 0))
+        total["max_wall_ms"] = max(total["max_wall_ms"], summary.get("max_wall_ms", 0.0))
+        for move_index, count in summary.get("cutoffs", {}).items():
+            total["cutoffs"][move_index] = total["cutoffs"].get(move_index, 0) + count
+    total["mean_wall_ms"] = total["wall_ms"] / total["moves"] if total["moves"] else 0.0
+    return total
@@ -0,0 +1,101 @@
+import csv
+import json
+import sys
+import time
+
+FIELDS = ("episode", "win_rate", "draw_rate", "loss_rate", "q_entries_x", "q_entries_o", "memory_bytes",
+          "episodes_per_second", "avg_game_length", "elapsed_s")
+
+
+def estimate_table_bytes(table):
+    """Estimates the memory of a Q-table: exact for the array-backed tables, sampled from one entry for dicts."""
+    if hasattr(table, "nbytes"):
+        return table.nbytes
+    size = sys.getsizeof(table)
+    for state, row in table.items():
+        entry = sys.getsizeof(state) + sys.getsizeof(row)
+        if isinstance(state, tuple):
+            entry += sum(sys.getsizeof(part) for part in state)  # Board rows; the symbols themselves are shared
+        if isinstance(row, list):
+            entry += sum(sys.getsizeof(value) for value in row)
+        size += entry * len(table)
+        break
+    return size
+
+
+class TrainingTelemetry:
+    """Training metrics written every `every` episodes to a JSON-lines or CSV file.
+
+    The trainer calls episode() once per game, which only bumps counters; every `every` episodes a record
+    with the learner's win, draw and loss rates and the game length and throughput over those episodes is
+    written, together with the current Q-table sizes; close() writes the episodes left over. The file
+    is overwritten, one training run per file, and its format follows the extension (.csv, else JSON
+    lines). With output=None nothing is written and the counters can be merged into another
+    TrainingTelemetry with add(), as the parallel trainer does.
+    """
+    def __init__(self, output=None, every=1000):
+        self.output = output
+        self.every = every
+        self.episodes = 0
+        self.start = self.last_emit = time.perf_counter()
+        self._reset_interval()
+        self.players = None  # The Q-learning players of the last episode, for the record written by close()
+        self.file = self.writer = None
+        if output is not None:
+            self.file = open(output, "w", newline="")
+            if output.endswith(".csv"):
+                self.writer = csv.DictWriter(self.file, FIELDS)
+                self.writer.writeheader()
+
+    def _reset_interval(self):
+        self.outcomes = {"win": 0, "draw": 0, "loss": 0}
+        self.moves = 0
+
+    def episode(self, outcome, length, ql_player_x, ql_player_o):
+        """Counts one finished game; outcome is "win", "draw" or "loss" for the learning player."""
+        self.episodes += 1
+        self.outcomes[outcome] += 1
+        self.moves += length
+        if self.file is not None:  # Counting-only telemetry goes back to the parallel trainer without the players
+            self.players = ql_player_x, ql_player_o
+        if self.every and not self.episodes % self.every:
+            self.emit(ql_player_x, ql_player_o)
+
+    def add(self, other):
+        """Adds the episodes counted by another TrainingTelemetry since its last record."""
+        self.episodes += sum(other.outcomes.values())
+        for outcome, count in other.outcomes.items():
+            self.outcomes[outcome] += count
+        self.moves += other.moves
+
+    def emit(self, ql_player_x, ql_player_o):
+        """Writes a record for the episodes since the last one and starts a new interval."""
+        now = time.perf_counter()
+        self.players = ql_player_x, ql_player_o
+        played = sum(self.outcomes.values())
+        if played and self.file is not None:
+            record = {"episode": self.episodes,
+                      "win_rate": self.outcomes["win"] / played,
+                      "draw_rate": self.outcomes["draw"] / played,
+                      "loss_rate": self.outcomes["loss"] / played,
+                      "q_entries_x": len(ql_player_x.q_table),
+                      "q_entries_o": len(ql_player_o.q_table),
+                      "memory_bytes": estimate_table_bytes(ql_player_x.q_table) + estimate_table_bytes(ql_player_o.q_table),
+                      "episodes_per_second": played / max(now - self.last_emit, 1e-9),
+                      "avg_game_length": self.moves / played,
+                      "elapsed_s": now - self.start}
+            if self.writer is not None:
+                self.writer.writerow(record)
+            else:
+                self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+        self.last_emit = now
+        self._reset_interval()
+
+    def close(self):
+        """Writes a record for the episodes since the last one, if any, and closes the file."""
+        if self.players is not None and sum(self.outcomes.values()):
+            self.emit(*self.players)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
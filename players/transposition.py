@@ -0,0 +1,75 @@
+# Bound types stored with each entry
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    """Fixed-size table of search results keyed by a 64-bit position hash.
+
+    Entries are (key, depth, value, flag, best_move) tuples. With the "depth" replacement policy each
+    hash maps to one slot that keeps the deeper search. With "two_tier" each hash maps to a pair of slots:
+    the first keeps the deepest entry seen, the second always takes the newest one.
+    """
+    def __init__(self, size=1 << 18, replacement="two_tier"):
+        if replacement not in ("depth", "two_tier"):
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+        if replacement == "two_tier" and size % 2:
+            raise ValueError("Two-tier tables need an even size.")
+        self.size = size
+        self.replacement = replacement
+        self.entries = [None] * size
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Removes all entries."""
+        self.entries = [None] * self.size
+        self.count = 0
+
+    def lookup(self, key):
+        """Returns the entry stored for the given key, or None."""
+        if self.replacement == "depth":
+            entry = self.entries[key % self.size]
+            if entry is not None and entry[0] == key:
+                return entry
+            return None
+        index = (key % (self.size // 2)) * 2
+        for entry in (self.entries[index], self.entries[index + 1]):
+            if entry is not None and entry[0] == key:
+                return entry
+        return None
+
+    def store(self, key, depth, value, flag, best_move):
+        """Stores a search result, subject to the replacement policy."""
+        entry = (key, depth, value, flag, best_move)
+        if self.replacement == "depth":
+            index = key % self.size
+            current = self.entries[index]
+            if current is None:
+                self.count += 1
+            elif current[0] != key and current[1] > depth:
+                return
+            self.entries[index] = entry
+            return
+
+        index = (key % (self.size // 2)) * 2
+        deep, recent = self.entries[index], self.entries[index + 1]
+        if recent is not None and recent[0] == key:
+            # Keep a single copy of each key in the pair
+            self.entries[index + 1] = None
+            self.count -= 1
+            recent = None
+        if deep is None or deep[0] == key or depth >= deep[1]:
+            if deep is None:
+                self.count += 1
+            elif deep[0] != key:
+                # Demote the old deep entry to the always-replace slot
+                if recent is None:
+                    self.count += 1
+                self.entries[index + 1] = deep
+            self.entries[index] = entry
+        else:
+            if recent is None:
+                self.count += 1
+            self.entries[index + 1] = entry
@@ -0,0 +1,101 @@
+import itertools
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from players.evaluation import evaluate
+from players.qleaarning import (Connect4QLearningPlayer, Connect4RandomPlayer, TTTQLearningPlayer, TTTRandomPlayer,
+                                train_q_learning_players)
+
+PARAM_NAMES = ("learning_rate", "discount_factor", "exploration_rate")
+
+
+def _win_rate(ql_player_x, ql_player_o, game_class, num_games, seed, stop_width):
+    """Plays the greedy Q-learning players against random players, up to num_games on each side."""
+    random_player_class = TTTRandomPlayer if game_class.to_string() == "ttt" else Connect4RandomPlayer
+    # Trials already run on a process pool, so each one evaluates in its own process
+    as_x = evaluate(ql_player_x.frozen_policy(), random_player_class("O"), game_class, num_games, seed,
+                    max_workers=1, stop_width=stop_width)
+    as_o = evaluate(random_player_class("X"), ql_player_o.frozen_policy(), game_class, num_games, seed,
+                    max_workers=1, stop_width=stop_width)
+    return (as_x["counts"]["X"] + as_o["counts"]["O"]) / (as_x["games"] + as_o["games"])
+
+
+def _run_trial(game_class, params, seed, num_episodes, eval_games, eval_stop_width):
+    """Trains one pair of players from scratch and returns their win rate against random play."""
+    random.seed(seed)
+    np.random.seed(seed)
+    ql_player_class = TTTQLearningPlayer if game_class.to_string() == "ttt" else Connect4QLearningPlayer
+    ql_player_x = ql_player_class("X", **params)
+    ql_player_o = ql_player_class("O", **params)
+    train_q_learning_players(num_episodes, ql_player_x, ql_player_o, game_class, verbose=False)
+    return _win_rate(ql_player_x, ql_player_o, game_class, eval_games, seed, eval_stop_width)
+
+
+def _trial_key(params, seed, num_episodes):
+    return tuple(params[name] for name in PARAM_NAMES) + (seed, num_episodes)
+
+
+def _load_results(results_path):
+    """Reads trials recorded by an earlier, possibly interrupted, run."""
+    results = {}
+    if results_path is not None and os.path.exists(results_path):
+        with open(results_path) as results_file:
+            for line in results_file:
+                if line.strip():
+                    record = json.loads(line)
+                    results[_trial_key(record, record["seed"], record["episodes"])] = record["win_rate"]
+    return results
+
+
+def rung_budgets(num_episodes, num_configs, eta=3, min_episodes=1000):
+    """Returns the training budget of each successive-halving rung, ending with num_episodes."""
+    rungs = max(0, math.ceil(math.log(num_configs, eta))) if num_configs > 1 else 0
+    budgets = [num_episodes // eta ** rung for rung in range(rungs, -1, -1)]
+    return [budget for budget in budgets if budget >= min_episodes][:-1] + [num_episodes]
+
+
+def tune_parameters_parallel(game_class, num_episodes, param_grid, seeds=(0,), eta=3, min_episodes=1000,
+                             eval_games=100, eval_stop_width=None, max_workers=None, results_path=None):
+    """Grid search over the Q-learning hyperparameters with successive halving on a process pool.
+
+    Every rung trains the surviving configurations from scratch, once per seed, on a growing share of
+    num_episodes, and keeps the best 1/eta of them by mean win rate against random play over up to
+    eval_games games per side, fewer once the win rates' confidence intervals are narrower than
+    eval_stop_width (see players.evaluation.evaluate). Each finished trial is appended to results_path
+    as a JSON line; on restart, trials already in the file are not run again. Returns the best parameters and their mean win rate at the full budget.
+    """
+    configs = [dict(zip(PARAM_NAMES, values)) for values in itertools.product(*(param_grid[name] for name in PARAM_NAMES))]
+    results = _load_results(results_path)
+    scores = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as executor:
+        for budget in rung_budgets(num_episodes, len(configs), eta, min_episodes):
+            futures = {}
+            for index, params in enumerate(configs):
+                for seed in seeds:
+                    if _trial_key(params, seed, budget) not in results:
+                        future = executor.submit(_run_trial, game_class, params, seed, budget, eval_games,
+                                                 eval_stop_width)
+                        futures[future] = (params, seed)
+            for future in as_completed(futures):
+                params, seed = futures[future]
+                win_rate = future.result()
+                results[_trial_key(params, seed, budget)] = win_rate
+                if results_path is not None:
+                    with open(results_path, "a") as results_file:
+                        results_file.write(json.dumps({**params, "seed": seed, "episodes": budget, "win_rate": win_rate}) + "\n")
+
+            scores = {index: sum(results[_trial_key(params, seed, budget)] for seed in seeds) / len(seeds)
+                      for index, params in enumerate(configs)}
+            ranked = sorted(range(len(configs)), key=lambda index: scores[index], reverse=True)
+            print(f"{budget} episodes: best win rate {scores[ranked[0]]:.3f} of {len(configs)} configurations")
+            if budget != num_episodes:
+                configs = [configs[index] for index in ranked[:max(1, math.ceil(len(configs) / eta))]]
+
+    best = max(range(len(configs)), key=lambda index: scores[index])
+    return configs[best], scores[best]
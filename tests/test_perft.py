@@ -0,0 +1,22 @@
+from benchmark import perft_connect4, perft_ttt
+from game.connect4 import BitboardConnect4, Connect4
+from game.ttt import BitboardTicTacToe, TicTacToe
+
+# Move sequences of each length, games that ended early included at the ply they ended
+TTT_PERFT = [1, 9, 72, 504, 3024, 15120, 54720, 148176, 200448, 127872]
+TTT_GAMES = 255168
+
+
+def test_ttt_perft():
+    for game_class in (TicTacToe, BitboardTicTacToe):
+        counts = [perft_ttt(game_class(), depth) for depth in range(10)]
+        assert counts == TTT_PERFT
+        # Sequences that did not end continue with one move per empty cell, the others are finished games
+        games = counts[9] + sum(counts[depth] - counts[depth + 1] // (9 - depth) for depth in range(9))
+        assert games == TTT_GAMES
+
+
+def test_connect4_perft():
+    # No game can end within 6 moves
+    for game_class in (Connect4, BitboardConnect4):
+        assert [perft_connect4(game_class(), depth) for depth in range(7)] == [7 ** depth for depth in range(7)]
@@ -0,0 +1,180 @@
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from players.frozen_policy import FrozenPolicy
+from players.stats import SearchStats, merge
+
+
+# Set in each worker process by _init_worker
+_trained_players = {}
+
+
+def _init_worker(ql_player_class, shared_policy_x, shared_policy_o):
+    """Opens the trained Q-learning players' greedy policies once per worker."""
+    _trained_players["class"] = ql_player_class
+    _trained_players["X"] = _open_policy(shared_policy_x)
+    _trained_players["O"] = _open_policy(shared_policy_o)
+
+
+def _share_player(player):
+    """Makes a trained player's greedy FrozenPolicy available to the workers without copying it.
+
+    A policy saved with the player's checkpoint is memory-mapped by every worker from its file. Otherwise
+    the policy is built here, once, and moved into shared memory. Returns the shared policy, which the
+    caller must unlink, or None, and a handle for _open_policy() that is cheap to send to workers.
+    """
+    if player.policy_path is not None:
+        return None, ("file", player.policy_path, player.symbol)
+    policy, handle = player.frozen_policy().to_shared_memory()
+    return policy, ("shared", handle)
+
+
+def _open_policy(handle):
+    if handle[0] == "file":
+        return FrozenPolicy.load(*handle[1:])
+    return FrozenPolicy.attach(handle[1])
+
+
+def _make_player(player_class, symbol):
+    if player_class == _trained_players["class"]:
+        return _trained_players[symbol]
+    return player_class(symbol)
+
+
+def _play_chunk(simulate, player_x_class, player_o_class, num_games, seed, collect_search_stats=False):
+    """Plays num_games games of one pairing and returns (X wins, O wins, draws, X search stats, O search stats).
+
+    The search stats are merged SearchStats summaries of the players that have a stats attribute,
+    and None otherwise or when collect_search_stats is off.
+    """
+    random.seed(seed)
+    player_x, player_o = _make_player(player_x_class, "X"), _make_player(player_o_class, "O")
+    if collect_search_stats:
+        for player in (player_x, player_o):
+            if hasattr(player, "stats"):
+                player.stats = SearchStats()
+    x_wins = o_wins = draws = 0
+    for winner, _, _ in simulate(player_x, player_o, num_games):
+        if winner == "X":
+            x_wins += 1
+        elif winner == "O":
+            o_wins += 1
+        else:
+            draws += 1
+    summaries = {"X": None, "O": None}
+    if collect_search_stats:
+        for player in (player_x, player_o):
+            if hasattr(player, "stats"):
+                summaries[player.symbol] = player.stats.summary(games=num_games)
+    return x_wins, o_wins, draws, summaries["X"], summaries["O"]
+
+
+def run_tournament(player_classes, simulate, ql_player_class, trained_ql_player_x, trained_ql_player_o, num_games,
+                   max_workers=None, chunk_size=None, seed=None, collect_search_stats=False):
+    """Plays num_games games for every ordered pairing of different player classes on a process pool.
+
+    simulate is the game module's headless simulate(player_x, player_o, n_games). Each pairing is split
+    into chunks of chunk_size games, played by one pair of players, so that slow pairings spread over all
+    workers. The trained Q-learning players play as greedy FrozenPolicy players without exploration,
+    opened by every worker through the pool initializer from the policy files saved with their
+    checkpoints, or else built once in this process and put in shared memory, so they are neither
+    pickled nor copied. Returns {"x,o": game_stats} in the format the
+    tournament scripts print.
+
+    With collect_search_stats, the minimax players get a fresh SearchStats every chunk and the return
+    value is (result, {"x,o": {"X": summary, "O": summary}}), a summary being None for players that do
+    not search.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    pairings = [(x, o) for x in player_classes for o in player_classes if x != o]
+    if chunk_size is None:
+        # Aim for a few tasks per worker so that they all stay busy until the end
+        chunk_size = max(1, min(num_games, math.ceil(len(pairings) * num_games / (4 * max_workers))))
+
+    policy_x, shared_policy_x = _share_player(trained_ql_player_x)
+    policy_o, shared_policy_o = _share_player(trained_ql_player_o)
+    try:
+        return _run_pool(pairings, simulate, ql_player_class, shared_policy_x, shared_policy_o, num_games,
+                         max_workers, chunk_size, seed, collect_search_stats)
+    finally:
+        for policy in (policy_x, policy_o):
+            if policy is not None:
+                policy.unlink()
+
+
+def _run_pool(pairings, simulate, ql_player_class, shared_policy_x, shared_policy_o, num_games,
+              max_workers, chunk_size, seed, collect_search_stats):
+    seeds = random.Random(seed)
+    result, remaining, search_stats = {}, {}, {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(ql_player_class, shared_policy_x, shared_policy_o)) as executor:
+        futures = {}
+        for player_x_class, player_o_class in pairings:
+            name_x, name_o = player_x_class.to_string(), player_o_class.to_string()
+            result[name_x + "," + name_o] = {
+                name_x + " wins": 0,
+                name_o + " wins": 0,
+                name_x + " draws": 0,
+                name_o + " draws": 0,
+                name_x + " win rate (%)": 0,
+                name_o + " win rate (%)": 0
+            }
+            remaining[name_x + "," + name_o] = 0
+            search_stats[name_x + "," + name_o] = {"X": [], "O": []}
+            for start in range(0, num_games, chunk_size):
+                games = min(chunk_size, num_games - start)
+                future = executor.submit(_play_chunk, simulate, player_x_class, player_o_class, games,
+                                         seeds.getrandbits(64), collect_search_stats)
+                futures[future] = (name_x, name_o)
+                remaining[name_x + "," + name_o] += 1
+
+        for future in as_completed(futures):
+            name_x, name_o = futures[future]
+            key = name_x + "," + name_o
+            x_wins, o_wins, draws, stats_x, stats_o = future.result()
+            for symbol, summary in (("X", stats_x), ("O", stats_o)):
+                if summary is not None:
+                    search_stats[key][symbol].append(summary)
+            game_stats = result[key]
+            game_stats[name_x + " wins"] += x_wins
+            game_stats[name_o + " wins"] += o_wins
+            game_stats[name_x + " draws"] += draws
+            game_stats[name_o + " draws"] += draws
+            remaining[key] -= 1
+            if not remaining[key]:
+                total_games = num_games * 2  # Total games played by both players
+                game_stats[name_x + " win rate (%)"] = (game_stats[name_x + " wins"] / total_games) * 100
+                game_stats[name_o + " win rate (%)"] = (game_stats[name_o + " wins"] / total_games) * 100
+                print(name_x, "vs", name_o, "done")
+    if collect_search_stats:
+        return result, {key: {symbol: merge(summaries) if summaries else None for symbol, summaries in sides.items()}
+                        for key, sides in search_stats.items()}
+    return result
+
+
+def print_results(result, player_classes, num_games):
+    """Prints the pairing table and the total wins, draws and losses of each player."""
+    print("\nPairing Results:")
+    pairing_df = pd.DataFrame(result).T
+    print(pairing_df.fillna("-"))
+    pairing_df = pairing_df.fillna(0).astype(int)
+
+    # Calculate total wins, draws, and losses for each player
+    total_results = {}
+    for player in player_classes:
+        total_games = (len(player_classes) - 1) * 2 * num_games
+        player_name = player.to_string()
+        total_wins = sum(pairing_df[player_name + " wins"])
+        total_draws = sum(pairing_df[player_name + " draws"])
+        total_losses = total_games - total_wins - total_draws
+        total_win_rate = total_wins / total_games * 100
+        total_results[player_name] = {"Games": total_games, "Wins": total_wins, "Draws": total_draws, "Losses": total_losses, "Win Rate (%)": f"{total_win_rate:.2f}"}
+
+    # Display total results for each player
+    print("\nTotal Results:")
+    total_results_df = pd.DataFrame(total_results).T
+    print(total_results_df)
@@ -1,5 +1,5 @@
 import numpy as np
-from players.qleaarning import tune_parameters
+from players.tuning import tune_parameters_parallel
 from game.ttt import TicTacToe
 
 
@@ -10,8 +10,12 @@ param_grid = {
     'exploration_rate': [0.1, 0.2, 0.3]
 }
 
-# Tune the parameters
-best_params, best_avg_win_rate = tune_parameters(TicTacToe, 40_000, param_grid)
+if __name__ == "__main__":
+    # Tune the parameters; finished trials are kept in the results file so an interrupted sweep can resume.
+    # Each trial plays up to 1000 evaluation games per side, stopping once the win rate is known to within 0.1
+    best_params, best_avg_win_rate = tune_parameters_parallel(TicTacToe, 40_000, param_grid, eval_games=1000,
+                                                              eval_stop_width=0.1,
+                                                              results_path="ttt_qlearning_tuning.jsonl")
 
-print("Best Parameters:", best_params)
-print("Best Average Win Rate:", best_avg_win_rate)
\ No newline at end of file
+    print("Best Parameters:", best_params)
+    print("Best Average Win Rate:", best_avg_win_rate)